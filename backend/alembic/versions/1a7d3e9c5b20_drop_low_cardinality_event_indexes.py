@@ -0,0 +1,37 @@
+"""drop low-cardinality single-column indexes on event tables
+
+Revision ID: 1a7d3e9c5b20
+Revises: e7c2d5a1f4b9
+Create Date: 2026-02-25 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "1a7d3e9c5b20"
+down_revision: Union[str, Sequence[str], None] = "e7c2d5a1f4b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Enum/boolean columns are covered by composites with a selective prefix
+    # (ix_event_feed_channel_severity_created_id, ix_event_user_state_user_read_event).
+    op.drop_index(op.f("ix_event_feed_channel"), table_name="event_feed")
+    op.drop_index(op.f("ix_event_feed_severity"), table_name="event_feed")
+    op.drop_index(op.f("ix_event_feed_event_type"), table_name="event_feed")
+    op.drop_index(op.f("ix_event_user_state_is_read"), table_name="event_user_state")
+    op.drop_index(op.f("ix_event_user_state_is_dismissed"), table_name="event_user_state")
+    op.drop_index(op.f("ix_event_user_state_is_handled"), table_name="event_user_state")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_event_user_state_is_handled"), "event_user_state", ["is_handled"], unique=False)
+    op.create_index(op.f("ix_event_user_state_is_dismissed"), "event_user_state", ["is_dismissed"], unique=False)
+    op.create_index(op.f("ix_event_user_state_is_read"), "event_user_state", ["is_read"], unique=False)
+    op.create_index(op.f("ix_event_feed_event_type"), "event_feed", ["event_type"], unique=False)
+    op.create_index(op.f("ix_event_feed_severity"), "event_feed", ["severity"], unique=False)
+    op.create_index(op.f("ix_event_feed_channel"), "event_feed", ["channel"], unique=False)
@@ -0,0 +1,41 @@
+"""reorder event_feed composite index to lead with recency
+
+Revision ID: 2b8e4f0d6c31
+Revises: 1a7d3e9c5b20
+Create Date: 2026-02-25 00:10:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2b8e4f0d6c31"
+down_revision: Union[str, Sequence[str], None] = "1a7d3e9c5b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Feed reads are "latest N ordered by (created_at DESC, id DESC)" with optional channel/severity
+    # filters; low-cardinality enums as the prefix did not prune the ordered range scan.
+    op.drop_index(op.f("ix_event_feed_channel_severity_created_id"), table_name="event_feed")
+    op.create_index(
+        "ix_event_feed_created_id_channel_severity",
+        "event_feed",
+        [sa.text("created_at DESC"), sa.text("id DESC"), "channel", "severity"],
+        unique=False,
+        postgresql_using="btree",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_feed_created_id_channel_severity", table_name="event_feed")
+    op.create_index(
+        op.f("ix_event_feed_channel_severity_created_id"),
+        "event_feed",
+        ["channel", "severity", "created_at", "id"],
+        unique=False,
+    )
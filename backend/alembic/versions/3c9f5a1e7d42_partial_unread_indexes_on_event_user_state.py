@@ -0,0 +1,61 @@
+"""replace event_user_state read composite with partial unread indexes
+
+Revision ID: 3c9f5a1e7d42
+Revises: 2b8e4f0d6c31
+Create Date: 2026-02-25 00:20:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9f5a1e7d42"
+down_revision: Union[str, Sequence[str], None] = "2b8e4f0d6c31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        # Partial indexes are Postgres-only here; keep the full composite elsewhere.
+        return
+    # Hot reads only look for not-yet-read/dismissed/handled rows, so index just that slice.
+    op.drop_index(op.f("ix_event_user_state_user_read_event"), table_name="event_user_state")
+    op.create_index(
+        "ix_eus_user_unread",
+        "event_user_state",
+        ["user_id", "event_id"],
+        unique=False,
+        postgresql_where=sa.text("is_read = false"),
+    )
+    op.create_index(
+        "ix_eus_user_undismissed",
+        "event_user_state",
+        ["user_id", "event_id"],
+        unique=False,
+        postgresql_where=sa.text("is_dismissed = false"),
+    )
+    op.create_index(
+        "ix_eus_user_unhandled",
+        "event_user_state",
+        ["user_id", "event_id"],
+        unique=False,
+        postgresql_where=sa.text("is_handled = false"),
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_eus_user_unhandled", table_name="event_user_state")
+    op.drop_index("ix_eus_user_undismissed", table_name="event_user_state")
+    op.drop_index("ix_eus_user_unread", table_name="event_user_state")
+    op.create_index(
+        op.f("ix_event_user_state_user_read_event"),
+        "event_user_state",
+        ["user_id", "is_read", "event_id"],
+        unique=False,
+    )
@@ -0,0 +1,50 @@
+"""collapse login_history single-column indexes into targeted composites
+
+Revision ID: 4d0a6b2f8e53
+Revises: 3c9f5a1e7d42
+Create Date: 2026-02-25 00:30:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4d0a6b2f8e53"
+down_revision: Union[str, Sequence[str], None] = "3c9f5a1e7d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # result/source are low-cardinality enums; user_id is already the prefix of
+    # ix_login_history_user_created_id, which serves per-user timelines.
+    op.drop_index(op.f("ix_login_history_result"), table_name="login_history")
+    op.drop_index(op.f("ix_login_history_source"), table_name="login_history")
+    op.drop_index(op.f("ix_login_history_email"), table_name="login_history")
+    op.drop_index(op.f("ix_login_history_ip"), table_name="login_history")
+    op.drop_index(op.f("ix_login_history_user_id"), table_name="login_history")
+    op.create_index(
+        "ix_login_history_email_created",
+        "login_history",
+        [sa.text("email"), sa.text("created_at DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_login_history_ip_created",
+        "login_history",
+        [sa.text("ip"), sa.text("created_at DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_login_history_ip_created", table_name="login_history")
+    op.drop_index("ix_login_history_email_created", table_name="login_history")
+    op.create_index(op.f("ix_login_history_user_id"), "login_history", ["user_id"], unique=False)
+    op.create_index(op.f("ix_login_history_ip"), "login_history", ["ip"], unique=False)
+    op.create_index(op.f("ix_login_history_email"), "login_history", ["email"], unique=False)
+    op.create_index(op.f("ix_login_history_source"), "login_history", ["source"], unique=False)
+    op.create_index(op.f("ix_login_history_result"), "login_history", ["result"], unique=False)
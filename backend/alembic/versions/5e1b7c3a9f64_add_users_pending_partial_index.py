@@ -0,0 +1,33 @@
+"""add partial index for pending users
+
+Revision ID: 5e1b7c3a9f64
+Revises: 4d0a6b2f8e53
+Create Date: 2026-02-25 00:40:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e1b7c3a9f64"
+down_revision: Union[str, Sequence[str], None] = "4d0a6b2f8e53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Pending users are a small slice of the table; matches the users list/summary pending filter.
+    op.create_index(
+        "ix_users_pending",
+        "users",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("is_approved = false AND is_deleted = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_pending", table_name="users")
@@ -0,0 +1,28 @@
+"""drop event_user_state user_id index covered by the per-user composites
+
+Revision ID: 6f2c8d4b0a75
+Revises: 5e1b7c3a9f64
+Create Date: 2026-02-25 00:50:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6f2c8d4b0a75"
+down_revision: Union[str, Sequence[str], None] = "5e1b7c3a9f64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # user_id prefix is served by the per-user state indexes. ix_event_user_state_event_id stays:
+    # the unique key is re-led with user_id in the next revision, so it is the only index for
+    # event lookups and the event_id foreign key.
+    op.drop_index(op.f("ix_event_user_state_user_id"), table_name="event_user_state")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_event_user_state_user_id"), "event_user_state", ["user_id"], unique=False)
@@ -0,0 +1,43 @@
+"""lead event_user_state unique constraint with user_id and cover state flags
+
+Revision ID: 7a3d9e5c1b86
+Revises: 6f2c8d4b0a75
+Create Date: 2026-02-25 01:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7a3d9e5c1b86"
+down_revision: Union[str, Sequence[str], None] = "6f2c8d4b0a75"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        # INCLUDE is Postgres-only: elsewhere just re-lead the key with user_id.
+        with op.batch_alter_table("event_user_state") as batch_op:
+            batch_op.drop_constraint("uq_event_user_state_event_user", type_="unique")
+            batch_op.create_unique_constraint("uq_event_user_state_user_event", ["user_id", "event_id"])
+        return
+    # State lookups are always "this user, these events"; INCLUDE keeps read/dismissed/handled
+    # checks index-only on Postgres. Event-side lookups keep ix_event_user_state_event_id.
+    op.drop_constraint("uq_event_user_state_event_user", "event_user_state", type_="unique")
+    op.execute(
+        "ALTER TABLE event_user_state ADD CONSTRAINT uq_event_user_state_user_event "
+        "UNIQUE (user_id, event_id) INCLUDE (is_read, is_dismissed, is_handled)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        with op.batch_alter_table("event_user_state") as batch_op:
+            batch_op.drop_constraint("uq_event_user_state_user_event", type_="unique")
+            batch_op.create_unique_constraint("uq_event_user_state_event_user", ["event_id", "user_id"])
+        return
+    op.drop_constraint("uq_event_user_state_user_event", "event_user_state", type_="unique")
+    op.create_unique_constraint("uq_event_user_state_event_user", "event_user_state", ["event_id", "user_id"])
@@ -0,0 +1,39 @@
+"""store event_feed.meta_json as jsonb with a GIN index
+
+Revision ID: 8b4e0f6d2c97
+Revises: 7a3d9e5c1b86
+Create Date: 2026-02-25 01:10:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b4e0f6d2c97"
+down_revision: Union[str, Sequence[str], None] = "7a3d9e5c1b86"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("ALTER TABLE event_feed ALTER COLUMN meta_json TYPE jsonb USING meta_json::jsonb")
+    # jsonb_path_ops: smaller GIN, supports the containment (@>) lookups used for meta filters.
+    op.create_index(
+        "ix_event_feed_meta_gin",
+        "event_feed",
+        ["meta_json"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"meta_json": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_event_feed_meta_gin", table_name="event_feed")
+    op.execute("ALTER TABLE event_feed ALTER COLUMN meta_json TYPE json USING meta_json::json")
@@ -0,0 +1,55 @@
+"""store event/login timestamps as timestamptz with server-side defaults
+
+Revision ID: 9c5f1a7e3d08
+Revises: 8b4e0f6d2c97
+Create Date: 2026-02-25 01:20:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c5f1a7e3d08"
+down_revision: Union[str, Sequence[str], None] = "8b4e0f6d2c97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, has_server_default)
+TIMESTAMP_COLUMNS: list[tuple[str, str, bool]] = [
+    ("event_feed", "created_at", True),
+    ("event_user_state", "created_at", True),
+    ("event_user_state", "updated_at", True),
+    ("event_user_state", "read_at", False),
+    ("event_user_state", "dismissed_at", False),
+    ("event_user_state", "handled_at", False),
+    ("login_history", "created_at", True),
+]
+
+
+def upgrade() -> None:
+    # Existing values are naive UTC (written via utc_now_naive).
+    for table, column, has_default in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.DateTime(timezone=True),
+            existing_type=sa.DateTime(),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=sa.func.now() if has_default else False,
+        )
+
+
+def downgrade() -> None:
+    for table, column, has_default in reversed(TIMESTAMP_COLUMNS):
+        op.alter_column(
+            table,
+            column,
+            type_=sa.DateTime(),
+            existing_type=sa.DateTime(timezone=True),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=None if has_default else False,
+        )
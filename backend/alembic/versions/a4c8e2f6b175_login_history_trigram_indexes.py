@@ -0,0 +1,48 @@
+"""add trigram indexes for login_history email/ip substring search
+
+Revision ID: a4c8e2f6b175
+Revises: f2b7d3e9a164
+Create Date: 2026-02-25 03:10:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c8e2f6b175"
+down_revision: Union[str, Sequence[str], None] = "f2b7d3e9a164"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # The login-history filters are unanchored ILIKE '%q%', which the b-tree composites cannot
+    # serve. admin_audit_logs.action gets none: it holds a few dozen distinct values.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_login_history_email_trgm",
+        "login_history",
+        ["email"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"email": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_login_history_ip_trgm",
+        "login_history",
+        ["ip"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"ip": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_login_history_ip_trgm", table_name="login_history")
+    op.drop_index("ix_login_history_email_trgm", table_name="login_history")
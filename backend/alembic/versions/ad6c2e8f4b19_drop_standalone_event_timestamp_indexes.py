@@ -0,0 +1,31 @@
+"""drop standalone event timestamp indexes
+
+Revision ID: ad6c2e8f4b19
+Revises: 9c5f1a7e3d08
+Create Date: 2026-02-25 01:30:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ad6c2e8f4b19"
+down_revision: Union[str, Sequence[str], None] = "9c5f1a7e3d08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # event_feed recency scans use the ix_event_feed_created_id_channel_severity prefix;
+    # event_user_state is only ever read per user, never ordered by its own timestamps.
+    op.drop_index(op.f("ix_event_feed_created_at"), table_name="event_feed")
+    op.drop_index(op.f("ix_event_user_state_created_at"), table_name="event_user_state")
+    op.drop_index(op.f("ix_event_user_state_updated_at"), table_name="event_user_state")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_event_user_state_updated_at"), "event_user_state", ["updated_at"], unique=False)
+    op.create_index(op.f("ix_event_user_state_created_at"), "event_user_state", ["created_at"], unique=False)
+    op.create_index(op.f("ix_event_feed_created_at"), "event_feed", ["created_at"], unique=False)
@@ -0,0 +1,38 @@
+"""cover expires_at in the active trusted-devices index
+
+Revision ID: b5d9f3a7c286
+Revises: a4c8e2f6b175
+Create Date: 2026-02-25 03:20:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5d9f3a7c286"
+down_revision: Union[str, Sequence[str], None] = "a4c8e2f6b175"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The per-user trust summary (count(id), count/max(expires_at) over active devices) becomes an
+    # index-only scan; the key columns still serve the ordered active-device listing.
+    op.execute("DROP INDEX IF EXISTS ix_td_active_user_lu_ca_id_desc")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_td_active_user_lu_ca_id_desc "
+        "ON trusted_devices (user_id, last_used_at DESC, created_at DESC, id DESC) "
+        "INCLUDE (expires_at) "
+        "WHERE revoked_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_td_active_user_lu_ca_id_desc")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_td_active_user_lu_ca_id_desc "
+        "ON trusted_devices (user_id, last_used_at DESC, created_at DESC, id DESC) "
+        "WHERE revoked_at IS NULL"
+    )
@@ -0,0 +1,57 @@
+"""restrict login_history email/ip indexes to failed attempts
+
+Revision ID: be7d3f9a5c20
+Revises: ad6c2e8f4b19
+Create Date: 2026-02-25 01:40:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "be7d3f9a5c20"
+down_revision: Union[str, Sequence[str], None] = "ad6c2e8f4b19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# success and code_sent make up the bulk of history and are never part of lockout checks.
+FAILED_RESULT_PREDICATE = "result NOT IN ('success', 'code_sent')"
+
+
+def upgrade() -> None:
+    op.drop_index("ix_login_history_email_created", table_name="login_history")
+    op.drop_index("ix_login_history_ip_created", table_name="login_history")
+    op.create_index(
+        "ix_login_history_email_failed",
+        "login_history",
+        [sa.text("email"), sa.text("created_at DESC")],
+        unique=False,
+        postgresql_where=sa.text(FAILED_RESULT_PREDICATE),
+    )
+    op.create_index(
+        "ix_login_history_ip_failed",
+        "login_history",
+        [sa.text("ip"), sa.text("created_at DESC")],
+        unique=False,
+        postgresql_where=sa.text(FAILED_RESULT_PREDICATE),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_login_history_ip_failed", table_name="login_history")
+    op.drop_index("ix_login_history_email_failed", table_name="login_history")
+    op.create_index(
+        "ix_login_history_ip_created",
+        "login_history",
+        [sa.text("ip"), sa.text("created_at DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_login_history_email_created",
+        "login_history",
+        [sa.text("email"), sa.text("created_at DESC")],
+        unique=False,
+    )
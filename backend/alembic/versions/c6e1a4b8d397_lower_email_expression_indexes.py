@@ -0,0 +1,39 @@
+"""add lower(email) expression indexes for case-insensitive lookups
+
+Revision ID: c6e1a4b8d397
+Revises: b5d9f3a7c286
+Create Date: 2026-02-25 03:30:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c6e1a4b8d397"
+down_revision: Union[str, Sequence[str], None] = "b5d9f3a7c286"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Root-admin profile lookups and admin sync match lower(users.email) IN (...); the unique
+    # index on the raw column cannot serve that predicate.
+    op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")], unique=False)
+    # Pending-access "requested at" is max(created_at) per lower(email) over request_access
+    # attempts only.
+    op.create_index(
+        "ix_auth_attempts_request_access_email_lower",
+        "auth_attempts",
+        [sa.text("lower(email)"), sa.text("created_at DESC")],
+        unique=False,
+        postgresql_where=sa.text("action = 'request_access'"),
+        sqlite_where=sa.text("action = 'request_access'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_auth_attempts_request_access_email_lower", table_name="auth_attempts")
+    op.drop_index("ix_users_email_lower", table_name="users")
@@ -0,0 +1,36 @@
+"""store event_feed channel and severity as native enums
+
+Revision ID: cf8e4a0b6d31
+Revises: be7d3f9a5c20
+Create Date: 2026-02-25 01:50:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "cf8e4a0b6d31"
+down_revision: Union[str, Sequence[str], None] = "be7d3f9a5c20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # 4-byte enum keys instead of varchar keep ix_event_feed_created_id_channel_severity leaves narrow.
+    op.execute("CREATE TYPE event_channel AS ENUM ('notification', 'action')")
+    op.execute("CREATE TYPE event_severity AS ENUM ('info', 'warning', 'danger')")
+    op.execute("ALTER TABLE event_feed ALTER COLUMN channel TYPE event_channel USING channel::event_channel")
+    op.execute("ALTER TABLE event_feed ALTER COLUMN severity TYPE event_severity USING severity::event_severity")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("ALTER TABLE event_feed ALTER COLUMN severity TYPE VARCHAR(20) USING severity::text")
+    op.execute("ALTER TABLE event_feed ALTER COLUMN channel TYPE VARCHAR(20) USING channel::text")
+    op.execute("DROP TYPE event_severity")
+    op.execute("DROP TYPE event_channel")
@@ -0,0 +1,44 @@
+"""add admin_audit_logs recency composites for the audit list
+
+Revision ID: d09f5b1c7e42
+Revises: cf8e4a0b6d31
+Create Date: 2026-02-25 02:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d09f5b1c7e42"
+down_revision: Union[str, Sequence[str], None] = "cf8e4a0b6d31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # /admin/audit orders by (created_at, id) in either direction and optionally filters by action;
+    # the single-column action/created_at indexes are prefixes of these and go away.
+    op.create_index(
+        "ix_admin_audit_logs_created_id",
+        "admin_audit_logs",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_admin_audit_logs_action_created_id",
+        "admin_audit_logs",
+        ["action", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_admin_audit_logs_created_at"), table_name="admin_audit_logs")
+    op.drop_index(op.f("ix_admin_audit_logs_action"), table_name="admin_audit_logs")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_admin_audit_logs_action"), "admin_audit_logs", ["action"], unique=False)
+    op.create_index(op.f("ix_admin_audit_logs_created_at"), "admin_audit_logs", ["created_at"], unique=False)
+    op.drop_index("ix_admin_audit_logs_action_created_id", table_name="admin_audit_logs")
+    op.drop_index("ix_admin_audit_logs_created_id", table_name="admin_audit_logs")
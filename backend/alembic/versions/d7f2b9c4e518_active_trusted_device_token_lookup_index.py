@@ -0,0 +1,38 @@
+"""partial index for active trusted-device token lookups
+
+Revision ID: d7f2b9c4e518
+Revises: c6e1a4b8d397
+Create Date: 2026-02-25 03:45:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7f2b9c4e518"
+down_revision: Union[str, Sequence[str], None] = "c6e1a4b8d397"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # /auth/start matches (user_id, token_hash) among active devices only. The partial index
+    # covers the whole predicate and skips revoked rows, so the full token_hash index (used by
+    # nothing else) is dropped.
+    op.create_index(
+        "ix_trusted_devices_active_user_token",
+        "trusted_devices",
+        ["user_id", "token_hash"],
+        unique=False,
+        postgresql_where=sa.text("revoked_at IS NULL"),
+        sqlite_where=sa.text("revoked_at IS NULL"),
+    )
+    op.drop_index(op.f("ix_trusted_devices_token_hash"), table_name="trusted_devices")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_trusted_devices_token_hash"), "trusted_devices", ["token_hash"], unique=False)
+    op.drop_index("ix_trusted_devices_active_user_token", table_name="trusted_devices")
@@ -0,0 +1,38 @@
+"""add trigram index for users email substring search
+
+Revision ID: e1a6c2d8f053
+Revises: d09f5b1c7e42
+Create Date: 2026-02-25 02:10:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1a6c2d8f053"
+down_revision: Union[str, Sequence[str], None] = "d09f5b1c7e42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # gin_trgm_ops serves ILIKE '%q%' directly, so list_users search keeps its email.ilike filter.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_users_email_trgm",
+        "users",
+        ["email"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"email": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_users_email_trgm", table_name="users")
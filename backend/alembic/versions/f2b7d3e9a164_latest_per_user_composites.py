@@ -0,0 +1,42 @@
+"""add (user, id DESC) composites for latest-row-per-user lookups
+
+Revision ID: f2b7d3e9a164
+Revises: e1a6c2d8f053
+Create Date: 2026-02-25 03:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b7d3e9a164"
+down_revision: Union[str, Sequence[str], None] = "e1a6c2d8f053"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # DISTINCT ON (user) ... ORDER BY user, id DESC reads the first entry of each group straight
+    # from these. target_user_id is their prefix, so the single-column event_feed index goes away.
+    op.create_index(
+        "ix_login_history_user_id_desc",
+        "login_history",
+        ["user_id", sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_event_feed_target_user_id_desc",
+        "event_feed",
+        ["target_user_id", sa.text("id DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_event_feed_target_user_id"), table_name="event_feed")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_event_feed_target_user_id"), "event_feed", ["target_user_id"], unique=False)
+    op.drop_index("ix_event_feed_target_user_id_desc", table_name="event_feed")
+    op.drop_index("ix_login_history_user_id_desc", table_name="login_history")
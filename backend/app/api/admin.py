@@ -5,24 +5,26 @@ from typing import Any, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, case, func, or_, update
 from sqlalchemy.orm import Session
 
 from app.core.admin_sync import (
+    get_runtime_admin_email_set,
     get_runtime_admin_emails,
     is_root_admin_email,
+    normalize_email,
     parse_admin_emails,
     sync_admin_users,
     validate_admin_emails,
     write_admin_emails_to_env_file,
 )
-from app.core.api_response import success_response_payload
+from app.core.api_response import success_json_response, success_response_payload
 from app.core.event_catalog import SECURITY_ADMIN_ACTIONS, audit_action_catalog_payload
 from app.core.export_utils import csv_attachment_response, xlsx_attachment_response
 from app.core.metrics import increment_counter
-from app.core.monitoring_cache import invalidate_cache_prefix
 from app.core.observability import log_business_event
 from app.core.security import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
     get_user_role,
     require_permission,
 )
@@ -37,9 +39,11 @@ from app.db.session import get_db
 from app.services.admin_bulk import (
     BulkActionPayload,
     available_actions_for_user,
-    available_actions_for_users,
+    approve_pending_users,
     bulk_action_catalog_payload,
-    execute_bulk_action_for_user,
+    execute_bulk_action_for_users,
+    load_pending_approval_candidates,
+    order_bulk_actions,
 )
 from app.services.admin_monitoring import (
     get_monitoring_focus_history_payload,
@@ -48,32 +52,35 @@ from app.services.admin_monitoring import (
     update_monitoring_settings_payload,
 )
 from app.services.admin_actions import (
+    AdminActionEntry,
     is_bulk_action_allowed_for_actor,
     log_admin_action as svc_log_admin_action,
+    log_admin_actions as svc_log_admin_actions,
     require_reason,
-    send_login_code_for_user,
+    send_login_codes_for_users,
 )
 from app.services.admin_queries import (
+    apply_list_cursor,
     build_audit_rows_query,
-    build_last_login_map,
     build_login_history_query,
-    build_trust_summary_map,
-    count_login_history_ip_occurrences,
-    count_login_history_result_since,
+    build_user_aux_maps,
+    count_audit_rows,
+    count_login_history_risk_signals,
+    encode_list_cursor,
     load_active_trusted_devices_for_user,
     build_pending_access_flags_for_users,
     load_latest_request_access_requested_at_by_email,
     load_recent_admin_audit_for_user,
     load_recent_login_history_for_user,
     load_users_by_email_map,
+    load_users_by_ids,
+    parse_list_cursor,
 )
 from app.services.admin_serializers import (
     build_user_details_anomalies,
     build_user_profile_snapshot,
     iter_audit_export_rows,
     iter_login_history_export_rows,
-    iter_serialized_audit_rows,
-    iter_serialized_login_history_rows,
     serialize_audit_rows,
     serialize_login_history_rows,
     serialize_trusted_devices,
@@ -89,15 +96,34 @@ from app.services.reason_policy import (
 router = APIRouter(prefix="/admin", tags=["admin"])
 logger = logging.getLogger(__name__)
 
-SECURITY_ACTIONS = {
-    *SECURITY_ADMIN_ACTIONS,
-    "update_admin_emails",
-}
+SECURITY_ACTIONS = SECURITY_ADMIN_ACTIONS | {"update_admin_emails"}
+
+# Login rows loaded for user details (device hints, recent list and risk signals).
+LOGIN_HISTORY_DETAILS_LIMIT = 200
+
+# Columns read by list snapshots (projected rows expose the same attribute names as User).
+USER_LIST_COLUMNS = (
+    User.id,
+    User.email,
+    User.role,
+    User.trust_policy,
+    User.is_admin,
+    User.is_approved,
+    User.is_blocked,
+    User.is_deleted,
+)
+
 
 class ApproveUserIn(BaseModel):
     role: Literal["editor", "viewer", "admin"]
 
 
+class ApproveUsersBulkIn(BaseModel):
+    user_ids: list[int]
+    role: Literal["editor", "viewer"]
+    reason: str | None = None
+
+
 class BulkUsersIn(BaseModel):
     user_ids: list[int]
     action: Literal[
@@ -144,6 +170,11 @@ class TrustedDeviceRevokeExceptIn(BaseModel):
     reason: str | None = None
 
 
+class TrustedDeviceRevokeBatchIn(BaseModel):
+    device_ids: list[int]
+    reason: str | None = None
+
+
 def _utc_now_naive() -> datetime:
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
@@ -155,6 +186,7 @@ def _log_admin_action(
     action: str,
     target_user_id: int | None = None,
     meta_json: dict | None = None,
+    created_at: datetime | None = None,
 ) -> None:
     svc_log_admin_action(
         db=db,
@@ -165,36 +197,57 @@ def _log_admin_action(
         meta_json=meta_json,
         security_actions=SECURITY_ACTIONS,
         logger=logger,
-        created_at=_utc_now_naive(),
+        created_at=created_at or _utc_now_naive(),
     )
 
-def _calc_trusted_days_left(db: Session, user_id: int) -> float | None:
-    now = _utc_now_naive()
-    devices = (
-        db.query(TrustedDevice)
-        .filter(
-            TrustedDevice.user_id == user_id,
-            TrustedDevice.revoked_at.is_(None),
-        )
-        .all()
+
+def _log_admin_actions(db: Session, request: Request, actor: User, entries: list[AdminActionEntry]) -> None:
+    svc_log_admin_actions(
+        db=db,
+        request=request,
+        actor=actor,
+        entries=entries,
+        security_actions=SECURITY_ACTIONS,
+        logger=logger,
+        created_at=_utc_now_naive(),
     )
+
+def _calc_trusted_days_left(devices: list[TrustedDevice], now: datetime) -> float | None:
     if not devices:
         return None
 
-    if any(d.expires_at is None for d in devices):
-        return -1.0
-
-    max_exp = max(d.expires_at for d in devices if d.expires_at is not None)
+    max_exp = None
+    for d in devices:
+        if d.expires_at is None:
+            return -1.0
+        if max_exp is None or d.expires_at > max_exp:
+            max_exp = d.expires_at
     delta_days = (max_exp - now).total_seconds() / 86400
     return round(max(delta_days, 0), 1)
 
 
-def _estimate_jwt_expiry(last_success_login: LoginHistory | None) -> tuple[str | None, int | None]:
+def _fetch_list_page(query, *, created_col, id_col, seek, sort_dir, page: int, page_size: int):
+    """Return (rows, next_cursor) for a (created_at, id)-ordered list query.
+
+    With a cursor the page is a keyset seek (``page`` is ignored, no OFFSET); without one the
+    legacy page/OFFSET path is used. One extra row is fetched to tell whether more follow.
+    """
+    if seek is not None:
+        query = apply_list_cursor(query, created_col=created_col, id_col=id_col, cursor=seek, sort_dir=sort_dir)
+    else:
+        query = query.offset((page - 1) * page_size)
+    rows = query.limit(page_size + 1).all()
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_list_cursor(rows[-1])
+
+
+def _estimate_jwt_expiry(last_success_login: LoginHistory | None, now: datetime) -> tuple[str | None, int | None]:
     if not last_success_login:
         return None, None
-    ttl_minutes = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
-    exp_at = last_success_login.created_at + timedelta(minutes=ttl_minutes)
-    left_seconds = int((exp_at - _utc_now_naive()).total_seconds())
+    exp_at = last_success_login.created_at + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    left_seconds = int((exp_at - now).total_seconds())
     return exp_at.isoformat(), max(left_seconds, 0)
 
 
@@ -212,7 +265,8 @@ def list_users(
     db: Session = Depends(get_db),
     _admin: User = Depends(require_permission("users.manage")),
 ):
-    query = db.query(User)
+    # Column projection: rows are plain tuples, no ORM instances or identity-map entries.
+    query = db.query(*USER_LIST_COLUMNS)
     if status == "pending":
         query = query.filter(User.is_approved.is_(False), User.is_deleted.is_(False))
     elif status == "approved":
@@ -235,10 +289,26 @@ def list_users(
     order_expr = sort_field.desc() if sort_dir == "desc" else sort_field.asc()
     query = query.order_by(order_expr, User.id.asc())
 
-    total = query.count() if (page is not None and include_total) else None
+    total = None
     safe_page = max(1, page or 1)
     safe_page_size = max(1, min(page_size, 200))
-    if page is not None:
+    if page is not None and include_total:
+        # count(*) OVER () is evaluated before LIMIT/OFFSET, so every page row carries the
+        # filtered total.
+        users = (
+            query.add_columns(func.count().over().label("total_count"))
+            .offset((safe_page - 1) * safe_page_size)
+            .limit(safe_page_size)
+            .all()
+        )
+        if users:
+            total = int(users[0].total_count)
+        elif safe_page == 1:
+            total = 0
+        else:
+            # Past the last page: no row to read the window total from.
+            total = query.order_by(None).count()
+    elif page is not None:
         users = query.offset((safe_page - 1) * safe_page_size).limit(safe_page_size).all()
     else:
         users = query.all()
@@ -247,8 +317,7 @@ def list_users(
     pending_requested_at_by_email = load_latest_request_access_requested_at_by_email(db, user_emails)
 
     user_ids = [u.id for u in users]
-    last_login_by_user_id = build_last_login_map(db, user_ids)
-    trust_summary_by_user_id = build_trust_summary_map(db, user_ids)
+    last_login_by_user_id, trust_summary_by_user_id = build_user_aux_maps(db, user_ids)
 
     pending_unread_by_user_id, pending_event_id_by_user_id = build_pending_access_flags_for_users(
         db,
@@ -256,26 +325,27 @@ def list_users(
         users=users,
     )
 
-    items = []
-    for u in users:
-        base = build_user_profile_snapshot(
-            user=u,
-            last_login=last_login_by_user_id.get(u.id),
-            trust_summary=trust_summary_by_user_id.get(u.id),
-        )
-        base.update(
-            {
-                "is_root_admin": is_root_admin_email(u.email),
-                "pending_requested_at": pending_requested_at_by_email.get(u.email.lower()),
-                "is_admin": u.is_admin,
-                "pending_unread": bool(pending_unread_by_user_id.get(u.id, False)),
-                "pending_event_id": pending_event_id_by_user_id.get(u.id),
-            }
-        )
-        items.append(base)
+    root_admin_emails = get_runtime_admin_email_set()
+    # Every value is already JSON-safe, so the page is encoded by orjson in a single call.
+    items = [
+        {
+            **build_user_profile_snapshot(
+                user=u,
+                last_login=last_login_by_user_id.get(u.id),
+                trust_summary=trust_summary_by_user_id.get(u.id),
+                root_admin_emails=root_admin_emails,
+            ),
+            "is_root_admin": normalize_email(u.email) in root_admin_emails,
+            "pending_requested_at": pending_requested_at_by_email.get(u.email.lower()),
+            "is_admin": u.is_admin,
+            "pending_unread": bool(pending_unread_by_user_id.get(u.id, False)),
+            "pending_event_id": pending_event_id_by_user_id.get(u.id),
+        }
+        for u in users
+    ]
 
     if page is not None:
-        return success_response_payload(
+        return success_json_response(
             request,
             data={
                 "items": items,
@@ -285,7 +355,7 @@ def list_users(
             },
         )
 
-    return success_response_payload(request, data=items)
+    return success_json_response(request, data=items)
 
 
 @router.get("/users/actions/catalog")
@@ -293,7 +363,7 @@ def users_actions_catalog(
     request: Request,
     admin: User = Depends(require_permission("users.manage")),
 ):
-    return success_response_payload(
+    return success_json_response(
         request,
         data=bulk_action_catalog_payload(include_admin_role=get_user_role(admin) == "root-admin"),
     )
@@ -304,7 +374,7 @@ def users_trust_policies_catalog(
     request: Request,
     _admin: User = Depends(require_permission("users.manage")),
 ):
-    return success_response_payload(request, data=trust_policy_catalog_payload())
+    return success_json_response(request, data=trust_policy_catalog_payload())
 
 
 @router.get("/audit/actions/catalog")
@@ -312,7 +382,7 @@ def audit_actions_catalog(
     request: Request,
     _admin: User = Depends(require_permission("audit.view")),
 ):
-    return success_response_payload(request, data=audit_action_catalog_payload())
+    return success_json_response(request, data=audit_action_catalog_payload())
 
 
 @router.get("/monitoring/settings")
@@ -344,7 +414,8 @@ def update_monitoring_settings_api(
         event="monitoring.settings.update",
         actor_email=admin.email,
     )
-    invalidate_cache_prefix("monitoring:")
+    # No cache invalidation: cached monitoring entries (history, focus, metrics snapshot) hold
+    # raw series/counters only; thresholds are applied when the summary is built.
     return success_response_payload(request, data=data)
 
 
@@ -361,7 +432,7 @@ def get_monitoring_history_api(
         step_seconds=step_seconds,
         force_refresh=force_refresh,
     )
-    return success_response_payload(request, data=payload)
+    return success_json_response(request, data=payload)
 
 
 @router.get("/monitoring/history/focus")
@@ -384,7 +455,7 @@ def get_monitoring_focus_history_api(
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return success_response_payload(request, data=payload)
+    return success_json_response(request, data=payload)
 
 
 @router.post("/users/actions/available")
@@ -399,18 +470,27 @@ def users_actions_available(
             request,
             data={"actions": [], "applicable_by_action": {}, "applicable_by_user": {}},
         )
-    users = db.query(User).filter(User.id.in_(payload.user_ids)).all()
-    available_candidates = available_actions_for_users(users)
+    users = load_users_by_ids(db, payload.user_ids)
+    # Each user's applicable set is computed once and reused for the union and the pair checks.
+    allowed_by_user = [(user, available_actions_for_user(user)) for user in users]
+    available_candidates = order_bulk_actions(set().union(*(allowed for _, allowed in allowed_by_user)))
     applicable_by_action: dict[str, list[int]] = {action: [] for action in available_candidates}
     applicable_by_user: dict[int, list[str]] = {}
+    root_admin_emails = get_runtime_admin_email_set()
+    actor_role = get_user_role(admin)
 
-    for user in users:
+    for user, allowed_set in allowed_by_user:
         user_actions: list[str] = []
-        allowed_set = available_actions_for_user(user)
         for action in available_candidates:
             if action not in allowed_set:
                 continue
-            can_apply, _ = is_bulk_action_allowed_for_actor(actor=admin, user=user, action=action)
+            can_apply, _ = is_bulk_action_allowed_for_actor(
+                actor=admin,
+                user=user,
+                action=action,
+                root_admin_emails=root_admin_emails,
+                actor_role=actor_role,
+            )
             if not can_apply:
                 continue
             user_actions.append(action)
@@ -440,38 +520,46 @@ def user_details(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    login_history_rows = load_recent_login_history_for_user(db, user.id, limit=200)
+    now = _utc_now_naive()
+    login_history_rows = load_recent_login_history_for_user(db, user.id, limit=LOGIN_HISTORY_DETAILS_LIMIT)
     login_rows = login_history_rows[:20]
     last_login = login_rows[0] if login_rows else None
     last_success_login = next((row for row in login_rows if row.result == "success"), None)
-    estimated_jwt_expires_at, estimated_jwt_left_seconds = _estimate_jwt_expiry(last_success_login)
+    estimated_jwt_expires_at, estimated_jwt_left_seconds = _estimate_jwt_expiry(last_success_login, now)
 
     admin_logs = load_recent_admin_audit_for_user(db, user.id, limit=10)
+    active_devices = load_active_trusted_devices_for_user(db, user.id)
     trusted_devices = serialize_trusted_devices(
-        devices=load_active_trusted_devices_for_user(db, user.id),
+        devices=active_devices,
         history_rows=login_history_rows,
-        now=_utc_now_naive(),
+        now=now,
     )
 
     known_ips = sorted({row.ip for row in login_rows if row.ip})
-    invalid_code_24h = count_login_history_result_since(
-        db,
-        user.id,
-        result="invalid_code",
-        since=_utc_now_naive() - timedelta(hours=24),
-    )
-    latest_row = login_rows[0] if login_rows else None
-    latest_ip_is_new = False
-    if latest_row and latest_row.ip:
-        latest_ip_count = count_login_history_ip_occurrences(db, user.id, ip=latest_row.ip)
-        latest_ip_is_new = latest_ip_count <= 1
+    invalid_since = now - timedelta(hours=24)
+    latest_ip = last_login.ip if last_login else None
+    if len(login_history_rows) < LOGIN_HISTORY_DETAILS_LIMIT:
+        # The whole history is already loaded: both signals come from memory.
+        invalid_code_24h = sum(
+            1 for row in login_history_rows if row.result == "invalid_code" and row.created_at >= invalid_since
+        )
+        latest_ip_count = sum(1 for row in login_history_rows if row.ip == latest_ip) if latest_ip else 0
+    else:
+        invalid_code_24h, latest_ip_count = count_login_history_risk_signals(
+            db,
+            user.id,
+            result="invalid_code",
+            since=invalid_since,
+            ip=latest_ip,
+        )
+    latest_ip_is_new = bool(latest_ip) and latest_ip_count <= 1
     anomalies = build_user_details_anomalies(
         login_rows=login_rows,
         invalid_code_24h=invalid_code_24h,
         latest_ip_is_new=latest_ip_is_new,
     )
 
-    return success_response_payload(
+    return success_json_response(
         request,
         data={
             "user": {
@@ -484,15 +572,15 @@ def user_details(
                 "is_blocked": user.is_blocked,
                 "is_deleted": user.is_deleted,
                 "trust_policy": user.trust_policy,
-                "trusted_days_left": _calc_trusted_days_left(db, user.id),
+                "trusted_days_left": _calc_trusted_days_left(active_devices, now),
                 "token_version": int(user.token_version),
-                "last_activity_at": last_login.created_at.isoformat() if last_login else None,
+                "last_activity_at": last_login.created_at if last_login else None,
                 "last_ip": last_login.ip if last_login else None,
                 "last_user_agent": last_login.user_agent if last_login else None,
                 "known_ips": known_ips,
             },
             "session": {
-                "jwt_ttl_minutes": int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60")),
+                "jwt_ttl_minutes": ACCESS_TOKEN_EXPIRE_MINUTES,
                 "estimated_jwt_expires_at": estimated_jwt_expires_at,
                 "estimated_jwt_left_seconds": estimated_jwt_left_seconds,
             },
@@ -548,6 +636,7 @@ def revoke_trusted_device(
             "policy": device.policy,
             "reason": (payload.reason or "").strip() or None,
         },
+        created_at=now,
     )
     db.commit()
     return success_response_payload(
@@ -572,30 +661,38 @@ def revoke_trusted_devices_except_one(
     if not can_apply:
         raise HTTPException(status_code=403, detail=reason or "Action is forbidden")
 
-    active_devices = (
-        db.query(TrustedDevice)
-        .filter(TrustedDevice.user_id == user.id, TrustedDevice.revoked_at.is_(None))
-        .order_by(TrustedDevice.last_used_at.desc(), TrustedDevice.created_at.desc(), TrustedDevice.id.desc())
-        .all()
-    )
-    if not active_devices:
-        return success_response_payload(request, data={"ok": True, "revoked_count": 0, "keep_device_id": None})
-
+    # Only the device to keep is resolved up front (one id or two aggregates), not every
+    # active device row; the UPDATE rowcount gives the revoked count.
+    active_filter = (TrustedDevice.user_id == user.id, TrustedDevice.revoked_at.is_(None))
     keep_device_id = payload.keep_device_id
     if keep_device_id is None:
-        keep_device_id = active_devices[0].id
-
-    if not any(d.id == keep_device_id for d in active_devices):
-        raise HTTPException(status_code=400, detail="keep_device_id is not active for this user")
+        keep_device_id = (
+            db.query(TrustedDevice.id)
+            .filter(*active_filter)
+            .order_by(TrustedDevice.last_used_at.desc(), TrustedDevice.created_at.desc(), TrustedDevice.id.desc())
+            .limit(1)
+            .scalar()
+        )
+        has_active = keep_device_id is not None
+    else:
+        active_count, keep_is_active = (
+            db.query(
+                func.count(TrustedDevice.id),
+                func.max(case((TrustedDevice.id == keep_device_id, 1), else_=0)),
+            )
+            .filter(*active_filter)
+            .one()
+        )
+        has_active = bool(active_count)
+        if has_active and not keep_is_active:
+            raise HTTPException(status_code=400, detail="keep_device_id is not active for this user")
+    if not has_active:
+        return success_response_payload(request, data={"ok": True, "revoked_count": 0, "keep_device_id": None})
 
     now = _utc_now_naive()
     revoked_count = (
         db.query(TrustedDevice)
-        .filter(
-            TrustedDevice.user_id == user.id,
-            TrustedDevice.revoked_at.is_(None),
-            TrustedDevice.id != keep_device_id,
-        )
+        .filter(*active_filter, TrustedDevice.id != keep_device_id)
         .update({TrustedDevice.revoked_at: now}, synchronize_session=False)
     )
 
@@ -610,6 +707,7 @@ def revoke_trusted_devices_except_one(
             "revoked_count": int(revoked_count),
             "reason": (payload.reason or "").strip() or None,
         },
+        created_at=now,
     )
     db.commit()
     return success_response_payload(
@@ -618,6 +716,64 @@ def revoke_trusted_devices_except_one(
     )
 
 
+@router.post("/users/{user_id}/trusted-devices/revoke-batch")
+def revoke_trusted_devices_batch(
+    user_id: int,
+    payload: TrustedDeviceRevokeBatchIn,
+    request: Request,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_permission("users.manage")),
+):
+    if not payload.device_ids:
+        raise HTTPException(status_code=400, detail="No devices selected")
+    user = db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    can_apply, reason = is_bulk_action_allowed_for_actor(actor=admin, user=user, action="revoke_trusted_devices")
+    if not can_apply:
+        raise HTTPException(status_code=403, detail=reason or "Action is forbidden")
+
+    # Ids of other users' devices or already revoked ones are ignored, like the single-device route;
+    # RETURNING gives the ids this statement actually revoked, so the response and audit match it.
+    now = _utc_now_naive()
+    revoked_ids = sorted(
+        db.execute(
+            update(TrustedDevice)
+            .where(
+                TrustedDevice.id.in_(set(payload.device_ids)),
+                TrustedDevice.user_id == user.id,
+                TrustedDevice.revoked_at.is_(None),
+            )
+            .values(revoked_at=now)
+            .returning(TrustedDevice.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+    if not revoked_ids:
+        db.rollback()
+        return success_response_payload(request, data={"ok": True, "revoked_count": 0, "device_ids": []})
+
+    _log_admin_action(
+        db,
+        request,
+        admin,
+        "revoke_trusted_devices_batch",
+        target_user_id=user.id,
+        meta_json={
+            "device_ids": revoked_ids,
+            "revoked_count": len(revoked_ids),
+            "reason": (payload.reason or "").strip() or None,
+        },
+        created_at=now,
+    )
+    db.commit()
+    return success_response_payload(
+        request,
+        data={"ok": True, "revoked_count": len(revoked_ids), "device_ids": revoked_ids, "revoked_at": now.isoformat()},
+    )
+
+
 @router.get("/settings/admin-emails")
 def get_admin_emails_settings(
     request: Request,
@@ -629,7 +785,8 @@ def get_admin_emails_settings(
 ):
     runtime = get_runtime_admin_emails()
     q_norm = q.strip().lower()
-    filtered_runtime = [email for email in runtime if not q_norm or q_norm in email.lower()]
+    # Runtime emails are already normalized: no per-email lower(), and no scan without a query.
+    filtered_runtime = [email for email in runtime if q_norm in email] if q_norm else runtime
     total = len(filtered_runtime)
     safe_page = max(1, page or 1)
     safe_page_size = max(1, min(page_size, 200))
@@ -641,21 +798,23 @@ def get_admin_emails_settings(
 
     db_profiles: dict[str, dict] = {}
     if page_emails:
-        users_by_email = load_users_by_email_map(db, page_emails)
+        # Same column projection as /admin/users: snapshots only read these attributes.
+        users_by_email = load_users_by_email_map(db, page_emails, columns=USER_LIST_COLUMNS)
         user_ids = [u.id for u in users_by_email.values()]
-        last_login_by_user_id = build_last_login_map(db, user_ids)
-        trust_summary_by_user_id = build_trust_summary_map(db, user_ids)
+        last_login_by_user_id, trust_summary_by_user_id = build_user_aux_maps(db, user_ids)
 
-        for email in page_emails:
-            hit = users_by_email.get((email or "").lower())
-            if not hit:
-                continue
-            snap = build_user_profile_snapshot(
+        # Runtime emails are normalized, so they match the map keys directly.
+        root_admin_emails = get_runtime_admin_email_set()
+        db_profiles = {
+            email: build_user_profile_snapshot(
                 user=hit,
                 last_login=last_login_by_user_id.get(hit.id),
                 trust_summary=trust_summary_by_user_id.get(hit.id),
+                root_admin_emails=root_admin_emails,
             )
-            db_profiles[email] = snap
+            for email in page_emails
+            if (hit := users_by_email.get(email)) is not None
+        }
     if page is not None:
         items = [
             {
@@ -715,7 +874,7 @@ def get_settings_summary(
     root_admins_value: int | None = None
     root_admins_ok = True
     try:
-        root_admins_value = len(get_runtime_admin_emails())
+        root_admins_value = len(get_runtime_admin_email_set())
     except Exception:
         root_admins_ok = False
 
@@ -825,8 +984,7 @@ def user_data_sanity(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    last_login_map = build_last_login_map(db, [user.id])
-    trust_summary_map = build_trust_summary_map(db, [user.id])
+    last_login_map, trust_summary_map = build_user_aux_maps(db, [user.id])
     snapshot = build_user_profile_snapshot(
         user=user,
         last_login=last_login_map.get(user.id),
@@ -905,7 +1063,7 @@ def update_admin_emails_settings(
     db: Session = Depends(get_db),
     admin: User = Depends(require_permission("root_admins.manage")),
 ):
-    normalized = sorted(set(parse_admin_emails(",".join(payload.emails))))
+    normalized = parse_admin_emails(",".join(payload.emails))
     if not normalized:
         raise HTTPException(status_code=400, detail="At least one admin email is required")
     validate_admin_emails(normalized)
@@ -917,6 +1075,16 @@ def update_admin_emails_settings(
         next_runtime_emails=normalized,
         actor_email=admin.email,
     )
+    if normalized == current_runtime:
+        # Both lists are normalized and sorted: nothing to write, sync or audit. Startup sync
+        # still reconciles any drift in the users table.
+        return success_response_payload(request, data={
+            "ok": True,
+            "admin_emails": normalized,
+            "sync": {"created": 0, "promoted": 0, "demoted": 0, "skipped_create_without_password": 0},
+            "note": "Admin emails are unchanged; nothing to sync.",
+            "reason_mode": reason_mode,
+        })
     reason = require_reason(payload.reason) if reason_mode == "required" else normalize_reason_text(payload.reason)
 
     write_admin_emails_to_env_file(normalized)
@@ -967,12 +1135,14 @@ def list_audit_logs(
     date_to: str = "",
     sort_dir: Literal["desc", "asc"] = "desc",
     include_total: bool = True,
+    cursor: str = "",
     request: Request = None,
     db: Session = Depends(get_db),
     _admin: User = Depends(require_permission("audit.view")),
 ):
     safe_page = max(1, page)
     safe_page_size = max(1, min(page_size, 200))
+    seek = parse_list_cursor(cursor)
     query = build_audit_rows_query(
         db=db,
         action=action,
@@ -984,15 +1154,37 @@ def list_audit_logs(
         sort_dir=sort_dir,
         security_actions=SECURITY_ACTIONS,
     )
-    total = query.count() if include_total else None
-    start = (safe_page - 1) * safe_page_size
-    rows = query.offset(start).limit(safe_page_size).all()
+    total = (
+        count_audit_rows(
+            db,
+            action=action,
+            actor_email=actor_email,
+            target_email=target_email,
+            security_only=security_only,
+            date_from=date_from,
+            date_to=date_to,
+            security_actions=SECURITY_ACTIONS,
+        )
+        if include_total and seek is None
+        else None
+    )
+    rows, next_cursor = _fetch_list_page(
+        query,
+        created_col=AdminAuditLog.created_at,
+        id_col=AdminAuditLog.id,
+        seek=seek,
+        sort_dir=sort_dir,
+        page=safe_page,
+        page_size=safe_page_size,
+    )
     items = serialize_audit_rows(rows)
-    return success_response_payload(request, data={
+    return success_json_response(request, data={
         "items": items,
         "total": total,
         "page": safe_page,
         "page_size": safe_page_size,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
     })
 
 
@@ -1009,12 +1201,14 @@ def list_login_history(
     page: int = 1,
     page_size: int = 50,
     include_total: bool = True,
+    cursor: str = "",
     request: Request = None,
     db: Session = Depends(get_db),
     _admin: User = Depends(require_permission("audit.view")),
 ):
     safe_page = max(1, page)
     safe_page_size = max(1, min(page_size, 200))
+    seek = parse_list_cursor(cursor)
     query = build_login_history_query(
         db=db,
         user_id=user_id,
@@ -1026,17 +1220,26 @@ def list_login_history(
         date_to=date_to,
         sort_dir=sort_dir,
     )
-    total = query.count() if include_total else None
-    start = (safe_page - 1) * safe_page_size
-    rows = query.offset(start).limit(safe_page_size).all()
+    total = query.order_by(None).count() if (include_total and seek is None) else None
+    rows, next_cursor = _fetch_list_page(
+        query,
+        created_col=LoginHistory.created_at,
+        id_col=LoginHistory.id,
+        seek=seek,
+        sort_dir=sort_dir,
+        page=safe_page,
+        page_size=safe_page_size,
+    )
     items = serialize_login_history_rows(rows)
-    return success_response_payload(
+    return success_json_response(
         request,
         data={
             "items": items,
             "total": total,
             "page": safe_page,
             "page_size": safe_page_size,
+            "has_more": next_cursor is not None,
+            "next_cursor": next_cursor,
         },
     )
 
@@ -1069,7 +1272,7 @@ def export_login_history_csv(
     return csv_attachment_response(
         filename="login_history.csv",
         header=["id", "created_at", "email", "result", "source", "ip", "user_agent"],
-        rows=iter_login_history_export_rows(iter_serialized_login_history_rows(rows_iter)),
+        rows=iter_login_history_export_rows(rows_iter),
     )
 
 
@@ -1102,7 +1305,7 @@ def export_login_history_xlsx(
         filename="login_history.xlsx",
         sheet_name="LoginHistory",
         header=["id", "created_at", "email", "result", "source", "ip", "user_agent"],
-        rows=iter_login_history_export_rows(iter_serialized_login_history_rows(rows_iter)),
+        rows=iter_login_history_export_rows(rows_iter),
     )
 
 
@@ -1133,7 +1336,7 @@ def export_audit_logs_csv(
     return csv_attachment_response(
         filename="admin_audit_logs.csv",
         header=["id", "created_at", "action", "actor_email", "target_email", "ip", "reason"],
-        rows=iter_audit_export_rows(iter_serialized_audit_rows(rows_iter)),
+        rows=iter_audit_export_rows(rows_iter),
     )
 
 
@@ -1165,7 +1368,7 @@ def export_audit_logs_xlsx(
         filename="admin_audit_logs.xlsx",
         sheet_name="Audit",
         header=["id", "created_at", "action", "actor_email", "target_email", "ip", "reason"],
-        rows=iter_audit_export_rows(iter_serialized_audit_rows(rows_iter)),
+        rows=iter_audit_export_rows(rows_iter),
     )
 
 
@@ -1207,6 +1410,68 @@ def approve_user(
     )
 
 
+@router.post("/users/approve-bulk")
+def approve_users_bulk(
+    payload: ApproveUsersBulkIn,
+    request: Request,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_permission("users.manage")),
+):
+    increment_counter("admin_bulk_total")
+    if not payload.user_ids:
+        raise HTTPException(status_code=400, detail="No users selected")
+
+    # Duplicate ids would otherwise yield one result and one audit row per repetition.
+    user_ids = list(dict.fromkeys(payload.user_ids))
+    candidates = {row.id: row for row in load_pending_approval_candidates(db, user_ids)}
+    # Same per-target actor policy as /users/bulk with action "approve".
+    rejected_by_user_id: dict[int, str] = {}
+    root_admin_emails = get_runtime_admin_email_set()
+    actor_role = get_user_role(admin)
+    for uid, row in candidates.items():
+        can_apply, detail = is_bulk_action_allowed_for_actor(
+            actor=admin,
+            user=row,
+            action="approve",
+            role=payload.role,
+            root_admin_emails=root_admin_emails,
+            actor_role=actor_role,
+        )
+        if not can_apply:
+            rejected_by_user_id[uid] = detail or "Action is forbidden"
+    approved_ids = set(
+        approve_pending_users(
+            db,
+            user_ids=[uid for uid in candidates if uid not in rejected_by_user_id],
+            role=payload.role,
+        )
+    )
+
+    reason = normalize_reason_text(payload.reason)
+    results = []
+    audit_entries: list[AdminActionEntry] = []
+    for uid in user_ids:
+        if uid not in approved_ids:
+            detail = rejected_by_user_id.get(uid, "User not found or not pending approval")
+            results.append({"user_id": uid, "ok": False, "detail": detail})
+            continue
+        row = candidates[uid]
+        meta = {"old_role": row.role, "new_role": payload.role}
+        if reason:
+            meta["reason"] = reason
+        audit_entries.append(
+            AdminActionEntry(action="approve", target_user_id=uid, target_email=row.email, meta_json=meta)
+        )
+        results.append({"user_id": uid, "ok": True, "action": "approve", "role": payload.role})
+    _log_admin_actions(db, request, admin, audit_entries)
+
+    changed = bool(approved_ids)
+    if changed:
+        db.commit()
+    increment_counter("admin_bulk_result_total", action="approve", changed=str(changed).lower())
+    return success_response_payload(request, data={"ok": True, "results": results})
+
+
 @router.post("/users/bulk")
 def bulk_users(
     payload: BulkUsersIn,
@@ -1218,7 +1483,7 @@ def bulk_users(
     if not payload.user_ids:
         raise HTTPException(status_code=400, detail="No users selected")
 
-    users = db.query(User).filter(User.id.in_(payload.user_ids)).all()
+    users = load_users_by_ids(db, payload.user_ids)
     user_map = {u.id: u for u in users}
     action_payload = BulkActionPayload(
         action=payload.action,
@@ -1227,18 +1492,19 @@ def bulk_users(
         reason=payload.reason.strip() if payload.reason else None,
     )
 
-    results = []
-    changed = False
-
+    rejected_by_user_id: dict[int, dict] = {}
+    eligible_users: dict[int, User] = {}
+    root_admin_emails = get_runtime_admin_email_set()
+    actor_role = get_user_role(admin)
     for uid in payload.user_ids:
         user = user_map.get(uid)
         if not user:
-            results.append({"user_id": uid, "ok": False, "detail": "User not found"})
+            rejected_by_user_id[uid] = {"ok": False, "detail": "User not found"}
             continue
 
         allowed = available_actions_for_user(user)
         if payload.action not in allowed:
-            results.append({"user_id": uid, "ok": False, "detail": f"Action {payload.action} is not applicable for this user"})
+            rejected_by_user_id[uid] = {"ok": False, "detail": f"Action {payload.action} is not applicable for this user"}
             continue
 
         can_apply, reason = is_bulk_action_allowed_for_actor(
@@ -1246,29 +1512,36 @@ def bulk_users(
             user=user,
             action=payload.action,
             role=payload.role,
+            root_admin_emails=root_admin_emails,
+            actor_role=actor_role,
         )
         if not can_apply:
-            results.append({"user_id": uid, "ok": False, "detail": reason or "Action is forbidden"})
+            rejected_by_user_id[uid] = {"ok": False, "detail": reason or "Action is forbidden"}
             continue
+        eligible_users[uid] = user
 
-        outcome = execute_bulk_action_for_user(
-            db=db,
-            user=user,
-            payload=action_payload,
-            log_action=lambda action, target_user, meta: _log_admin_action(
-                db,
-                request,
-                admin,
-                action,
+    audit_entries: list[AdminActionEntry] = []
+    outcome_by_user_id = execute_bulk_action_for_users(
+        db=db,
+        users=list(eligible_users.values()),
+        payload=action_payload,
+        log_action=lambda action, target_user, meta: audit_entries.append(
+            AdminActionEntry(
+                action=action,
                 target_user_id=target_user.id,
+                target_email=target_user.email,
                 meta_json=meta,
-            ),
-            send_login_code=send_login_code_for_user,
-        )
-        if outcome.get("ok"):
-            changed = True
-        results.append({"user_id": uid, **outcome})
+            )
+        ),
+        send_login_codes=send_login_codes_for_users,
+    )
+    changed = any(outcome.get("ok") for outcome in outcome_by_user_id.values())
+    results = [
+        {"user_id": uid, **(rejected_by_user_id.get(uid) or outcome_by_user_id[uid])}
+        for uid in payload.user_ids
+    ]
 
+    _log_admin_actions(db, request, admin, audit_entries)
     if changed:
         db.commit()
     increment_counter("admin_bulk_result_total", action=payload.action, changed=str(changed).lower())
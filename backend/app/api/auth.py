@@ -3,19 +3,21 @@ import re
 import logging
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from pydantic import BaseModel
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
 from app.core.event_catalog import request_access_event_meta
 from app.core.events import emit_event
-from app.core.api_response import success_response_payload
+from app.core.api_response import success_json_response
 from app.core.metrics import increment_counter
 from app.core.observability import log_business_event
 from app.core.permissions import permissions_matrix_payload
-from app.core.rate_limit import check_rate_limit, record_attempt
+from app.core.rate_limit import consume_rate_limit
 from app.core.security import (
     LOGIN_CODE_EXPIRE_MINUTES,
+    USER_BY_EMAIL,
     create_access_token,
     generate_login_code,
     generate_trusted_device_token,
@@ -26,7 +28,7 @@ from app.core.security import (
     hash_trusted_device_token,
     verify_login_code,
 )
-from app.core.utils import send_auth_code_email
+from app.core.utils import send_auth_code_email, smtp_configured
 from app.db.models.login_code import LoginCode
 from app.db.models.login_history import LoginHistory
 from app.db.models.trusted_device import TrustedDevice
@@ -45,8 +47,19 @@ VERIFY_CODE_WINDOW_MINUTES = int(os.getenv("VERIFY_CODE_WINDOW_MINUTES", "15"))
 TRUST_STANDARD_DAYS = int(os.getenv("TRUST_STANDARD_DAYS", "30"))
 TRUST_EXTENDED_DAYS = int(os.getenv("TRUST_EXTENDED_DAYS", "90"))
 ALLOW_PERMANENT_TRUST = os.getenv("ALLOW_PERMANENT_TRUST", "true").lower() == "true"
-
-EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+AUTH_DEV_SHOW_CODE = os.getenv("AUTH_DEV_SHOW_CODE", "false").lower() == "true"
+
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+# Prebuilt like USER_BY_EMAIL: start_auth only binds the user id and token hash.
+_ACTIVE_TRUSTED_DEVICE = (
+    select(TrustedDevice)
+    .where(
+        TrustedDevice.user_id == bindparam("user_id"),
+        TrustedDevice.token_hash == bindparam("token_hash"),
+        TrustedDevice.revoked_at.is_(None),
+    )
+    .limit(1)
+)
 
 
 class StartIn(BaseModel):
@@ -72,7 +85,7 @@ def _normalize_email(email: str) -> str:
 
 
 def _validate_email(email: str) -> None:
-    if not EMAIL_RE.match(email):
+    if not EMAIL_RE.fullmatch(email):
         raise HTTPException(status_code=400, detail="Invalid email format")
 
 
@@ -88,7 +101,21 @@ def _trusted_device_days(policy: str) -> int | None:
     return TRUST_STANDARD_DAYS
 
 
-def _issue_login_code(db: Session, user: User) -> dict:
+def _send_login_code_email(email: str, code: str) -> None:
+    # Runs after the response is sent, so an SMTP failure is logged and counted instead of
+    # failing /auth/start.
+    try:
+        sent = send_auth_code_email(email, code)
+    except Exception:
+        increment_counter("auth_code_email_failed_total", reason="smtp_error")
+        logger.exception("Login code email failed email=%s", email)
+        return
+    if not sent:
+        increment_counter("auth_code_email_failed_total", reason="not_configured")
+        logger.warning("Login code email not sent, SMTP is not configured email=%s", email)
+
+
+def _issue_login_code(db: Session, user: User, background_tasks: BackgroundTasks) -> dict:
     code = generate_login_code()
     challenge = LoginCode(
         user_id=user.id,
@@ -98,17 +125,24 @@ def _issue_login_code(db: Session, user: User) -> dict:
         attempts=0,
     )
     db.add(challenge)
+    # The flush's INSERT ... RETURNING fills challenge.id; reading it (and the email) before
+    # commit avoids the refresh SELECTs that expired instances would need afterwards.
+    db.flush()
+    challenge_id = challenge.id
+    email = user.email
     db.commit()
-    db.refresh(challenge)
 
-    sent = send_auth_code_email(user.email, code)
+    # The SMTP dial and send happen in a background task; only the configuration is checked here.
+    sent = smtp_configured()
+    if sent:
+        background_tasks.add_task(_send_login_code_email, email, code)
     response = {
         "status": "code_sent" if sent else "code_not_sent",
-        "challenge_id": challenge.id,
+        "challenge_id": challenge_id,
         "message": "Код отправлен на email." if sent else "SMTP не настроен.",
     }
 
-    if not sent and os.getenv("AUTH_DEV_SHOW_CODE", "false").lower() == "true":
+    if not sent and AUTH_DEV_SHOW_CODE:
         response["dev_code"] = code
         response["message"] = "SMTP не настроен. Dev-код возвращен в ответе."
 
@@ -141,7 +175,6 @@ def _write_login_history(
             user_agent=request.headers.get("user-agent", "")[:255] or None,
             result=result,
             source=source,
-            created_at=_utc_now_naive(),
         )
     )
     db.commit()
@@ -154,15 +187,9 @@ def _check_trusted_device(db: Session, user: User, token: str | None) -> bool:
         return False
 
     token_hash = hash_trusted_device_token(token)
-    device = (
-        db.query(TrustedDevice)
-        .filter(
-            TrustedDevice.user_id == user.id,
-            TrustedDevice.token_hash == token_hash,
-            TrustedDevice.revoked_at.is_(None),
-        )
-        .first()
-    )
+    device = db.execute(
+        _ACTIVE_TRUSTED_DEVICE, {"user_id": user.id, "token_hash": token_hash}
+    ).scalar_one_or_none()
     if not device:
         return False
 
@@ -176,20 +203,24 @@ def _check_trusted_device(db: Session, user: User, token: str | None) -> bool:
 
 
 @router.post("/start")
-def start_auth(payload: StartIn, request: Request, db: Session = Depends(get_db)):
+def start_auth(
+    payload: StartIn,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     increment_counter("auth_start_total")
     email = _normalize_email(payload.email)
     _validate_email(email)
-    check_rate_limit(db, email, "auth_start", limit=AUTH_START_LIMIT, window_minutes=AUTH_START_WINDOW_MINUTES)
+    consume_rate_limit(db, email, "auth_start", limit=AUTH_START_LIMIT, window_minutes=AUTH_START_WINDOW_MINUTES)
 
-    user = db.query(User).filter(User.email == email).first()
-    record_attempt(db, email, "auth_start")
+    user = db.execute(USER_BY_EMAIL, {"email": email}).scalar_one_or_none()
 
     if not user:
         increment_counter("auth_start_result_total", result="not_found")
         _write_login_history(db, request, email=email, result="not_found", source="start", user=None)
         log_business_event(logger, request, event="auth.start", result="not_found", email=email)
-        return success_response_payload(request, data={
+        return success_json_response(request, data={
             "status": "not_found",
             "message": "Пользователь не найден. Нажмите 'Запрос доступа'.",
         })
@@ -198,7 +229,7 @@ def start_auth(payload: StartIn, request: Request, db: Session = Depends(get_db)
         increment_counter("auth_start_result_total", result="deleted")
         _write_login_history(db, request, email=email, result="deleted", source="start", user=user)
         log_business_event(logger, request, event="auth.start", result="deleted", email=email)
-        return success_response_payload(
+        return success_json_response(
             request,
             data={"status": "not_found", "message": "Пользователь не найден. Нажмите 'Запрос доступа'."},
         )
@@ -206,7 +237,7 @@ def start_auth(payload: StartIn, request: Request, db: Session = Depends(get_db)
         increment_counter("auth_start_result_total", result="blocked")
         _write_login_history(db, request, email=email, result="blocked", source="start", user=user)
         log_business_event(logger, request, event="auth.start", result="blocked", email=email)
-        return success_response_payload(
+        return success_json_response(
             request,
             data={"status": "blocked", "message": "Пользователь заблокирован. Обратитесь к администратору."},
         )
@@ -215,7 +246,7 @@ def start_auth(payload: StartIn, request: Request, db: Session = Depends(get_db)
         increment_counter("auth_start_result_total", result="pending")
         _write_login_history(db, request, email=email, result="pending", source="start", user=user)
         log_business_event(logger, request, event="auth.start", result="pending", email=email)
-        return success_response_payload(request, data={
+        return success_json_response(request, data={
             "status": "pending",
             "message": "Заявка уже отправлена и ожидает подтверждения администратора.",
         })
@@ -226,7 +257,7 @@ def start_auth(payload: StartIn, request: Request, db: Session = Depends(get_db)
         increment_counter("auth_start_result_total", result="trusted_device")
         _write_login_history(db, request, email=email, result="success", source="trusted_device", user=user)
         log_business_event(logger, request, event="auth.start", result="trusted_device", email=email, role=role)
-        return success_response_payload(request, data={
+        return success_json_response(request, data={
             "status": "authenticated",
             "message": "Вход выполнен по доверенному устройству.",
             "access_token": token,
@@ -237,52 +268,68 @@ def start_auth(payload: StartIn, request: Request, db: Session = Depends(get_db)
     increment_counter("auth_start_result_total", result="code_sent")
     _write_login_history(db, request, email=email, result="code_sent", source="start", user=user)
     log_business_event(logger, request, event="auth.start", result="code_sent", email=email)
-    return success_response_payload(request, data=_issue_login_code(db, user))
+    return success_json_response(request, data=_issue_login_code(db, user, background_tasks))
 
 
-@router.post("/login")
-def login_alias(payload: StartIn, request: Request, db: Session = Depends(get_db)):
-    return start_auth(payload, request, db)
+# Legacy alias: the same endpoint registered under a second path.
+router.add_api_route("/login", start_auth, methods=["POST"])
 
 
 @router.post("/verify-code")
 def verify_code(payload: VerifyCodeIn, request: Request, db: Session = Depends(get_db)):
     increment_counter("auth_verify_total")
-    challenge = db.get(LoginCode, payload.challenge_id)
-    if not challenge:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid challenge")
-
-    user = db.get(User, challenge.user_id)
-    if not user:
+    # Challenge and its user in one round trip; a missing row of either is the same error.
+    row = (
+        db.query(LoginCode, User)
+        .join(User, User.id == LoginCode.user_id)
+        .filter(LoginCode.id == payload.challenge_id)
+        .one_or_none()
+    )
+    if row is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid challenge")
+    challenge, user = row
 
     email = user.email.lower()
-    check_rate_limit(db, email, "verify_code", limit=VERIFY_CODE_LIMIT, window_minutes=VERIFY_CODE_WINDOW_MINUTES)
+    # Every outcome past this point counts as an attempt, so it is taken up front.
+    consume_rate_limit(db, email, "verify_code", limit=VERIFY_CODE_LIMIT, window_minutes=VERIFY_CODE_WINDOW_MINUTES)
 
     now = _utc_now_naive()
     if challenge.used_at is not None or challenge.expires_at < now:
-        record_attempt(db, email, "verify_code")
         increment_counter("auth_verify_result_total", result="expired_or_used")
         _write_login_history(db, request, email=email, result="expired_or_used", source="verify_code", user=user)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Code expired or already used")
 
     if challenge.attempts >= 5:
-        record_attempt(db, email, "verify_code")
         increment_counter("auth_verify_result_total", result="too_many_attempts")
         _write_login_history(db, request, email=email, result="too_many_attempts", source="verify_code", user=user)
         raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many invalid attempts")
 
+    # The attempt bump and the success claim are conditional UPDATEs: concurrent requests for the
+    # same challenge cannot exceed the attempt limit or both consume the code.
+    challenge_row = db.query(LoginCode).filter(LoginCode.id == challenge.id)
     if not verify_login_code(payload.code, challenge.code_hash):
-        challenge.attempts += 1
+        counted = challenge_row.filter(LoginCode.attempts < 5).update(
+            {LoginCode.attempts: LoginCode.attempts + 1}, synchronize_session=False
+        )
         db.commit()
-        record_attempt(db, email, "verify_code")
+        if not counted:
+            increment_counter("auth_verify_result_total", result="too_many_attempts")
+            _write_login_history(db, request, email=email, result="too_many_attempts", source="verify_code", user=user)
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many invalid attempts")
         increment_counter("auth_verify_result_total", result="invalid_code")
         _write_login_history(db, request, email=email, result="invalid_code", source="verify_code", user=user)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid code")
 
-    challenge.used_at = now
-    db.commit()
-    record_attempt(db, email, "verify_code")
+    # Not committed here: the claim's row lock already serializes concurrent verifies, and the
+    # login-history commit below persists the claim together with the new trusted device. That is
+    # one commit per login, and ``user`` is not expired and re-selected in between.
+    claimed = challenge_row.filter(LoginCode.used_at.is_(None), LoginCode.attempts < 5).update(
+        {LoginCode.used_at: now}, synchronize_session=False
+    )
+    if not claimed:
+        increment_counter("auth_verify_result_total", result="expired_or_used")
+        _write_login_history(db, request, email=email, result="expired_or_used", source="verify_code", user=user)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Code expired or already used")
 
     if not user.is_approved or user.is_blocked or user.is_deleted:
         increment_counter("auth_verify_result_total", result="not_allowed")
@@ -313,14 +360,15 @@ def verify_code(payload: VerifyCodeIn, request: Request, db: Session = Depends(g
             last_used_at=now,
             revoked_at=None,
         )
+        # Committed with the claim and the success login-history row below, so the token is never
+        # returned for a device row that was not persisted.
         db.add(device)
-        db.commit()
         trusted_device_expires_at = expires_at.isoformat() if expires_at else None
 
     increment_counter("auth_verify_result_total", result="success")
     _write_login_history(db, request, email=email, result="success", source="verify_code", user=user)
     log_business_event(logger, request, event="auth.verify_code", result="success", email=user.email)
-    return success_response_payload(request, data={
+    return success_json_response(request, data={
         "access_token": token,
         "token_type": "bearer",
         "trusted_device_token": trusted_device_token,
@@ -334,16 +382,16 @@ def request_access(payload: RequestAccessIn, request: Request, db: Session = Dep
     increment_counter("auth_request_access_total")
     email = _normalize_email(payload.email)
     _validate_email(email)
-    check_rate_limit(
+    consume_rate_limit(
         db,
         email,
         "request_access",
         limit=REQUEST_ACCESS_LIMIT,
         window_minutes=REQUEST_ACCESS_WINDOW_MINUTES,
+        keep_attempt_row=True,
     )
 
-    user = db.query(User).filter(User.email == email).first()
-    record_attempt(db, email, "request_access")
+    user = db.execute(USER_BY_EMAIL, {"email": email}).scalar_one_or_none()
 
     if not user:
         user = User(
@@ -374,7 +422,7 @@ def request_access(payload: RequestAccessIn, request: Request, db: Session = Dep
         db.commit()
         increment_counter("auth_request_access_result_total", result="request_created")
         log_business_event(logger, request, event="auth.request_access", result="request_created", email=email)
-        return success_response_payload(
+        return success_json_response(
             request,
             data={"status": "request_created", "message": "Заявка отправлена на подтверждение."},
         )
@@ -397,27 +445,27 @@ def request_access(payload: RequestAccessIn, request: Request, db: Session = Dep
         )
         db.commit()
         increment_counter("auth_request_access_result_total", result="request_reopened")
-        return success_response_payload(
+        return success_json_response(
             request,
             data={"status": "request_created", "message": "Заявка отправлена на подтверждение."},
         )
 
     if user.is_blocked:
         increment_counter("auth_request_access_result_total", result="blocked")
-        return success_response_payload(
+        return success_json_response(
             request,
             data={"status": "blocked", "message": "Пользователь заблокирован."},
         )
 
     if user.is_approved:
         increment_counter("auth_request_access_result_total", result="approved")
-        return success_response_payload(
+        return success_json_response(
             request,
             data={"status": "approved", "message": "Пользователь уже подтвержден. Перейдите на вход."},
         )
 
     increment_counter("auth_request_access_result_total", result="already_pending")
-    return success_response_payload(
+    return success_json_response(
         request,
         data={"status": "already_pending", "message": "Заявка уже есть и ожидает подтверждения."},
     )
@@ -425,7 +473,7 @@ def request_access(payload: RequestAccessIn, request: Request, db: Session = Dep
 
 @router.get("/me")
 def me(request: Request, current_user: User = Depends(get_current_user)):
-    return success_response_payload(
+    return success_json_response(
         request,
         data={"email": current_user.email, "role": get_user_role(current_user)},
     )
@@ -433,7 +481,7 @@ def me(request: Request, current_user: User = Depends(get_current_user)):
 
 @router.get("/permissions-matrix")
 def permissions_matrix(request: Request, _: User = Depends(get_current_user)):
-    return success_response_payload(request, data=permissions_matrix_payload())
+    return success_json_response(request, data=permissions_matrix_payload())
 
 
 
@@ -72,7 +72,7 @@ def _fetch_events_with_state(
         q = q.filter(or_(EventFeed.actor_user_id.is_(None), EventFeed.actor_user_id != current_user.id))
 
     q = q.order_by(EventFeed.created_at.desc(), EventFeed.id.desc())
-    total = q.count() if include_total else None
+    total = q.order_by(None).count() if include_total else None
     events = q.offset((page - 1) * page_size).limit(page_size).all()
     event_ids = [e.id for e in events]
     states = ensure_event_states(db, user_id=current_user.id, event_ids=event_ids)
@@ -1,14 +1,14 @@
 import os
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
-from app.core.security import hash_password
 from app.db.models.user import User
 
-EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
 
 
 def normalize_email(value: str) -> str:
@@ -20,17 +20,33 @@ def parse_admin_emails(raw: str) -> list[str]:
     return sorted(set(emails))
 
 
+@lru_cache(maxsize=8)
+def _admin_emails_sorted(raw: str) -> tuple[str, ...]:
+    return tuple(parse_admin_emails(raw))
+
+
+@lru_cache(maxsize=8)
+def _admin_email_set(raw: str) -> frozenset[str]:
+    return frozenset(_admin_emails_sorted(raw))
+
+
 def get_runtime_admin_emails() -> list[str]:
-    return parse_admin_emails(os.getenv("ADMIN_EMAILS", ""))
+    """Normalized (lowercased) runtime root-admin emails, sorted."""
+    return list(_admin_emails_sorted(os.getenv("ADMIN_EMAILS", "")))
+
+
+def get_runtime_admin_email_set() -> frozenset[str]:
+    # Keyed by the raw env value, so updates written by write_admin_emails_to_env_file
+    # apply on the next call without explicit invalidation (a TTL would only add staleness).
+    return _admin_email_set(os.getenv("ADMIN_EMAILS", ""))
 
 
 def is_root_admin_email(email: str) -> bool:
-    target = normalize_email(email)
-    return target in set(get_runtime_admin_emails())
+    return normalize_email(email) in get_runtime_admin_email_set()
 
 
 def validate_admin_emails(emails: list[str]) -> None:
-    invalid = [email for email in emails if not EMAIL_RE.match(email)]
+    invalid = [email for email in emails if not EMAIL_RE.fullmatch(email)]
     if invalid:
         raise ValueError(f"Invalid emails: {', '.join(invalid)}")
 
@@ -44,6 +60,9 @@ class AdminSyncResult:
 
 
 def sync_admin_users(db: Session, admin_emails: list[str], admin_password: str | None) -> AdminSyncResult:
+    # Imported here: app.core.security reads the root-admin set from this module.
+    from app.core.security import hash_password
+
     result = AdminSyncResult()
     target = set(admin_emails)
     target_lower = {normalize_email(email) for email in admin_emails}
@@ -1,4 +1,6 @@
+import orjson
 from fastapi import Request
+from fastapi.responses import Response
 
 
 def get_request_id(request: Request) -> str:
@@ -36,3 +38,16 @@ def success_response_payload(
         "meta": meta or {},
         "request_id": get_request_id(request),
     }
+
+
+def success_json_response(
+    request: Request,
+    *,
+    data,
+    meta: dict | None = None,
+) -> Response:
+    # Payloads must already be JSON-safe (plain dicts/lists/str/numbers): jsonable_encoder is skipped.
+    return Response(
+        content=orjson.dumps(success_response_payload(request, data=data, meta=meta)),
+        media_type="application/json",
+    )
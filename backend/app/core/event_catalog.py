@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from app.core.events import EVENT_CHANNEL_ACTION, EVENT_CHANNEL_NOTIFICATION, EVENT_SEVERITY_INFO, EVENT_SEVERITY_WARNING
 
 ADMIN_ACTION_TITLE: dict[str, str] = {
@@ -9,6 +11,7 @@ ADMIN_ACTION_TITLE: dict[str, str] = {
     "revoke_trusted_devices": "Отзыв доверенных устройств",
     "revoke_trusted_device": "Отзыв доверенного устройства",
     "revoke_trusted_devices_except_one": "Отзыв доверенных устройств (кроме одного)",
+    "revoke_trusted_devices_batch": "Отзыв выбранных доверенных устройств",
     "send_code": "Отправка кода входа",
     "set_trust_policy": "Смена политики доверия",
     "set_role": "Смена роли",
@@ -20,20 +23,21 @@ ADMIN_ACTION_TITLE: dict[str, str] = {
     "update_admin_emails": "Обновление root-admin email",
 }
 
-SECURITY_ADMIN_ACTIONS = {
+SECURITY_ADMIN_ACTIONS = frozenset({
     "block",
     "unblock",
     "revoke_sessions",
     "revoke_trusted_devices",
     "revoke_trusted_device",
     "revoke_trusted_devices_except_one",
+    "revoke_trusted_devices_batch",
     "send_code",
     "delete_soft",
     "delete_hard",
     "set_role",
     "grant_admin",
     "revoke_admin",
-}
+})
 
 
 def admin_action_event_meta(action: str) -> dict:
@@ -54,6 +58,7 @@ def request_access_event_meta() -> dict:
     }
 
 
+@lru_cache(maxsize=1)
 def audit_action_catalog_payload() -> dict:
     return {
         "actions": [
@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
 
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from app.db.models.event_feed import EventFeed
@@ -36,8 +38,7 @@ def utc_now_naive() -> datetime:
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
-def emit_event(
-    db: Session,
+def build_event(
     *,
     event_type: str,
     channel: str,
@@ -51,7 +52,7 @@ def emit_event(
     meta_json: dict | None = None,
 ) -> EventFeed:
     resolved_target_path = target_path or _resolve_default_target_path(event_type, channel, meta_json)
-    event = EventFeed(
+    return EventFeed(
         event_type=event_type,
         channel=channel,
         severity=severity,
@@ -62,7 +63,34 @@ def emit_event(
         actor_user_id=actor_user_id,
         target_user_id=target_user_id,
         meta_json=meta_json,
-        created_at=utc_now_naive(),
+    )
+
+
+def emit_event(
+    db: Session,
+    *,
+    event_type: str,
+    channel: str,
+    title: str,
+    body: str | None = None,
+    severity: str = EVENT_SEVERITY_INFO,
+    target_path: str | None = None,
+    target_ref: str | None = None,
+    actor_user_id: int | None = None,
+    target_user_id: int | None = None,
+    meta_json: dict | None = None,
+) -> EventFeed:
+    event = build_event(
+        event_type=event_type,
+        channel=channel,
+        title=title,
+        body=body,
+        severity=severity,
+        target_path=target_path,
+        target_ref=target_ref,
+        actor_user_id=actor_user_id,
+        target_user_id=target_user_id,
+        meta_json=meta_json,
     )
     db.add(event)
     db.flush()
@@ -79,29 +107,33 @@ def ensure_event_states(db: Session, *, user_id: int, event_ids: list[int]) -> d
     )
     by_event_id = {s.event_id: s for s in states}
 
-    now = utc_now_naive()
-    created_any = False
-    for event_id in event_ids:
-        if event_id in by_event_id:
-            continue
-        st = EventUserState(
-            event_id=event_id,
-            user_id=user_id,
-            is_read=False,
-            read_at=None,
-            is_dismissed=False,
-            dismissed_at=None,
-            is_handled=False,
-            handled_at=None,
-            created_at=now,
-            updated_at=now,
+    missing_event_ids = [event_id for event_id in dict.fromkeys(event_ids) if event_id not in by_event_id]
+    if missing_event_ids:
+        # Concurrent readers may create the same rows; ON CONFLICT DO NOTHING skips them rather
+        # than raising IntegrityError.
+        insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        db.execute(
+            insert(EventUserState)
+            .values(
+                [
+                    {
+                        "event_id": event_id,
+                        "user_id": user_id,
+                        "is_read": False,
+                        "is_dismissed": False,
+                        "is_handled": False,
+                    }
+                    for event_id in missing_event_ids
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "event_id"])
         )
-        db.add(st)
-        by_event_id[event_id] = st
-        created_any = True
-
-    if created_any:
-        db.flush()
+        created = (
+            db.query(EventUserState)
+            .filter(EventUserState.user_id == user_id, EventUserState.event_id.in_(missing_event_ids))
+            .all()
+        )
+        by_event_id.update({s.event_id: s for s in created})
     return by_event_id
 
 
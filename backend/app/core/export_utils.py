@@ -1,25 +1,46 @@
 import csv
 import io
+import tempfile
 from collections.abc import Iterable, Iterator
 from typing import Any
 
+import xlsxwriter
 from fastapi.responses import Response, StreamingResponse
-from openpyxl import Workbook
+
+CSV_STREAM_CHUNK_CHARS = 64 * 1024
+XLSX_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+XLSX_STREAM_CHUNK_BYTES = 64 * 1024
+# Excel caps a sheet at 1,048,576 rows (xlsxwriter silently drops the rest); large exports are
+# split into segments of this many data rows, one worksheet per segment.
+XLSX_SEGMENT_ROWS = 250_000
 
 
 def _iter_csv_chunks(header: list[str], rows: Iterable[Iterable[Any]]) -> Iterator[str]:
     buffer = io.StringIO()
     writer = csv.writer(buffer)
     writer.writerow(header)
+    # Header goes out immediately so the download starts before the first rows are fetched.
     yield buffer.getvalue()
     buffer.seek(0)
     buffer.truncate(0)
 
     for row in rows:
-        writer.writerow(list(row))
+        writer.writerow(row)
+        if buffer.tell() >= CSV_STREAM_CHUNK_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
         yield buffer.getvalue()
-        buffer.seek(0)
-        buffer.truncate(0)
+
+
+def _iter_file_chunks(file_obj, chunk_size: int = XLSX_STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    try:
+        while chunk := file_obj.read(chunk_size):
+            yield chunk
+    finally:
+        file_obj.close()
 
 
 def csv_attachment_response(
@@ -42,17 +63,31 @@ def xlsx_attachment_response(
     header: list[str],
     rows: Iterable[Iterable[Any]],
 ) -> Response:
-    wb = Workbook(write_only=True)
-    ws = wb.create_sheet(title=sheet_name)
-    ws.append(header)
+    # Small exports stay in memory; large ones spill to disk and are streamed back in chunks.
+    out = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES)
+    # constant_memory flushes each row as soon as the next one starts, so rows must arrive in
+    # sheet order (they do: callers pass an already-sorted iterator). Exported values are data,
+    # never formulas or hyperlinks.
+    wb = xlsxwriter.Workbook(
+        out,
+        {"constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False},
+    )
+    ws = wb.add_worksheet(sheet_name)
+    ws.write_row(0, 0, header)
+    segment = 1
+    row_idx = 0
     for row in rows:
-        ws.append(list(row))
-
-    out = io.BytesIO()
-    wb.save(out)
+        if row_idx == XLSX_SEGMENT_ROWS:
+            segment += 1
+            ws = wb.add_worksheet(f"{sheet_name} ({segment})")
+            ws.write_row(0, 0, header)
+            row_idx = 0
+        row_idx += 1
+        ws.write_row(row_idx, 0, row)
+    wb.close()
     out.seek(0)
-    return Response(
-        content=out.getvalue(),
+    return StreamingResponse(
+        _iter_file_chunks(out),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
@@ -30,6 +30,16 @@ def get_metrics_snapshot_ttl_seconds() -> int:
     return _ttl_from_env("METRICS_SNAPSHOT_CACHE_TTL_SECONDS", 3)
 
 
+# Expired entries stay readable as stale for this long, so a single-flight rebuild can serve
+# the previous value to concurrent readers instead of making them wait on Prometheus.
+STALE_GRACE_SECONDS = 60
+
+# Builders are serialized through a fixed set of lock stripes, so the table stays bounded however
+# many distinct keys are built. Keys sharing a stripe only serialize their rebuilds.
+_INFLIGHT_STRIPES = 64
+_inflight: tuple[threading.Lock, ...] = tuple(threading.Lock() for _ in range(_INFLIGHT_STRIPES))
+
+
 def get_cached(key: str) -> T | None:
     now = _now()
     with _cache_lock:
@@ -38,11 +48,25 @@ def get_cached(key: str) -> T | None:
             return None
         expires_at, value = hit
         if expires_at <= now:
-            _cache.pop(key, None)
+            if expires_at + STALE_GRACE_SECONDS <= now:
+                _cache.pop(key, None)
             return None
         return value  # type: ignore[return-value]
 
 
+def _get_stale(key: str) -> T | None:
+    now = _now()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if not hit or hit[0] + STALE_GRACE_SECONDS <= now:
+            return None
+        return hit[1]  # type: ignore[return-value]
+
+
+def _key_lock(key: str) -> threading.Lock:
+    return _inflight[hash(key) % _INFLIGHT_STRIPES]
+
+
 def set_cached(key: str, value: T, ttl_seconds: int) -> T:
     expires_at = _now() + max(0, ttl_seconds)
     with _cache_lock:
@@ -58,6 +82,40 @@ def get_or_set_cached(key: str, ttl_seconds: int, factory: Callable[[], T]) -> T
     return set_cached(key, value, ttl_seconds)
 
 
+def get_or_build_single_flight(
+    key: str,
+    build: Callable[[], tuple[T, int]],
+    *,
+    force_refresh: bool = False,
+) -> T:
+    """Return the cached value for ``key`` or rebuild it with at most one builder at a time.
+
+    ``build`` returns ``(value, ttl_seconds)``. On a miss, one thread rebuilds while concurrent
+    callers get the stale value when there is one, or wait and reuse the fresh result.
+    ``force_refresh`` always rebuilds (still serialized per key).
+    """
+    if not force_refresh:
+        cached = get_cached(key)
+        if cached is not None:
+            return cached
+
+    lock = _key_lock(key)
+    if not lock.acquire(blocking=False):
+        stale = None if force_refresh else _get_stale(key)
+        if stale is not None:
+            return stale
+        lock.acquire()
+    try:
+        if not force_refresh:
+            cached = get_cached(key)
+            if cached is not None:
+                return cached
+        value, ttl_seconds = build()
+        return set_cached(key, value, ttl_seconds)
+    finally:
+        lock.release()
+
+
 def invalidate_cache_prefix(prefix: str) -> None:
     with _cache_lock:
         keys = [key for key in _cache.keys() if key.startswith(prefix)]
@@ -18,7 +18,8 @@ def paginate_query(
 
     safe_page = max(1, page)
     safe_page_size = max(1, min(page_size, max_page_size))
-    total = query.count()
+    # ORDER BY never changes a count; stripping it keeps the count subquery from sorting.
+    total = query.order_by(None).count()
     items = query.offset((safe_page - 1) * safe_page_size).limit(safe_page_size).all()
     return items, total, safe_page, safe_page_size
 
@@ -1,4 +1,5 @@
-﻿from typing import Literal
+﻿from functools import lru_cache
+from typing import Literal
 
 Permission = Literal[
     "events.view",
@@ -44,6 +45,8 @@ CAPABILITY_MATRIX: list[dict] = [
 ]
 
 
+# Static per process: built once and shared by every /auth/permissions-matrix call.
+@lru_cache(maxsize=1)
 def permissions_matrix_payload() -> dict:
     role_order = ["viewer", "editor", "admin", "root-admin"]
     return {
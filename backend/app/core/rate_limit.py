@@ -1,15 +1,78 @@
+import hashlib
+import logging
+import math
+import os
 from datetime import datetime, timedelta, timezone
 
+import redis
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.db.models.auth_attempt import AuthAttempt
 
+logger = logging.getLogger(__name__)
+
+# Token bucket: check, refill and take in one atomic EVALSHA. Redis TIME keeps the clock shared
+# across backend processes. Returns {allowed, retry_after_ms}.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, retry_after}
+"""
+
+_redis_client: redis.Redis | None = None
+_token_bucket = None
+
 
 def _utc_now() -> datetime:
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
+def _get_token_bucket():
+    """Registered token-bucket script, or None when REDIS_URL is not configured."""
+    global _redis_client, _token_bucket
+    url = os.getenv("REDIS_URL", "").strip()
+    if not url:
+        return None
+    if _token_bucket is None:
+        _redis_client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        # Script objects EVALSHA and reload the script themselves after a Redis restart.
+        _token_bucket = _redis_client.register_script(_TOKEN_BUCKET_LUA)
+    return _token_bucket
+
+
+def close_rate_limit_client() -> None:
+    global _redis_client, _token_bucket
+    if _redis_client is not None:
+        _redis_client.close()
+    _redis_client = None
+    _token_bucket = None
+
+
+def _too_many_requests(retry_after_seconds: int | None = None) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests. Try again later.",
+        headers={"Retry-After": str(retry_after_seconds)} if retry_after_seconds else None,
+    )
+
+
 def check_rate_limit(db: Session, email: str, action: str, limit: int, window_minutes: int) -> None:
     since = _utc_now() - timedelta(minutes=window_minutes)
     attempts = (
@@ -18,10 +81,7 @@ def check_rate_limit(db: Session, email: str, action: str, limit: int, window_mi
         .count()
     )
     if attempts >= limit:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Too many requests. Try again later.",
-        )
+        raise _too_many_requests()
 
 
 def record_attempt(db: Session, email: str, action: str) -> None:
@@ -33,3 +93,38 @@ def record_attempt(db: Session, email: str, action: str) -> None:
         )
     )
     db.commit()
+
+
+def consume_rate_limit(
+    db: Session,
+    email: str,
+    action: str,
+    *,
+    limit: int,
+    window_minutes: int,
+    keep_attempt_row: bool = False,
+) -> None:
+    """Count one attempt for ``(action, email)`` or raise 429.
+
+    With REDIS_URL set this is a single token-bucket round trip: ``limit`` tokens refilled over
+    ``window_minutes``, with no SQL. ``keep_attempt_row`` still writes the AuthAttempt row for
+    actions whose rows are read elsewhere, e.g. request_access feeds "pending since" in the admin
+    users list. Without Redis, or if Redis is unreachable, the SQL window count is used instead.
+    """
+    token_bucket = _get_token_bucket()
+    if token_bucket is not None:
+        key = f"rl:{action}:{hashlib.sha256(email.encode('utf-8')).hexdigest()}"
+        refill_per_ms = limit / (window_minutes * 60_000)
+        try:
+            allowed, retry_after_ms = token_bucket(keys=[key], args=[limit, repr(refill_per_ms)])
+        except redis.RedisError:
+            logger.warning("Redis rate limit unavailable, falling back to SQL action=%s", action, exc_info=True)
+        else:
+            if not allowed:
+                raise _too_many_requests(max(1, math.ceil(int(retry_after_ms) / 1000)))
+            if keep_attempt_row:
+                record_attempt(db, email, action)
+            return
+
+    check_rate_limit(db, email, action, limit=limit, window_minutes=window_minutes)
+    record_attempt(db, email, action)
@@ -4,13 +4,16 @@ import hmac
 import random
 import secrets
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
+from app.core.admin_sync import get_runtime_admin_email_set
 from app.core.permissions import Permission, has_permission
 from app.db.models.user import User
 from app.db.session import get_db
@@ -22,10 +25,9 @@ LOGIN_CODE_EXPIRE_MINUTES = int(os.getenv("LOGIN_CODE_EXPIRE_MINUTES", "10"))
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/start")
 
-
-def _runtime_root_admin_emails() -> set[str]:
-    raw = os.getenv("ADMIN_EMAILS", "")
-    return {x.strip().lower() for x in raw.split(",") if x.strip()}
+# Built once at import: the statement's cache key is memoized on the object and its compiled SQL
+# stays in the engine's compiled cache, so per-request lookups only bind the email.
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email")).limit(1)
 
 
 def _get_secret_key() -> str:
@@ -91,7 +93,7 @@ def get_current_user(
     except JWTError as exc:
         raise credentials_exception from exc
 
-    user = db.query(User).filter(User.email == email).first()
+    user = db.execute(USER_BY_EMAIL, {"email": email}).scalar_one_or_none()
     if not user or not user.is_approved or user.is_blocked or user.is_deleted:
         raise credentials_exception
     if token_version is None or int(token_version) != int(user.token_version):
@@ -99,8 +101,11 @@ def get_current_user(
     return user
 
 
-def get_user_role(user: User) -> str:
-    if (getattr(user, "email", "") or "").lower() in _runtime_root_admin_emails():
+def get_user_role(user: User, *, root_admin_emails: frozenset[str] | None = None) -> str:
+    # Callers resolving roles for many users pass one root-admin set for the whole request.
+    if root_admin_emails is None:
+        root_admin_emails = get_runtime_admin_email_set()
+    if (getattr(user, "email", "") or "").lower() in root_admin_emails:
         return "root-admin"
     if getattr(user, "role", None):
         return user.role
@@ -118,6 +123,10 @@ def require_admin_user(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
+# One dependency callable per permission, so FastAPI's per-request dependency cache dedupes
+# repeated checks of the same permission. The user lookup itself stays in get_current_user:
+# token_version and block/delete state must be re-read on every request.
+@lru_cache(maxsize=None)
 def require_permission(permission: Permission):
     def _dependency(current_user: User = Depends(get_current_user)) -> User:
         role = get_user_role(current_user)
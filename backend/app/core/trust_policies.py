@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 TRUST_POLICY_CATALOG: dict[str, dict] = {
     "strict": {
         "label": "strict",
@@ -38,5 +40,6 @@ TRUST_POLICY_CATALOG: dict[str, dict] = {
 }
 
 
+@lru_cache(maxsize=1)
 def trust_policy_catalog_payload() -> dict:
     return {"policies": [TRUST_POLICY_CATALOG[key] for key in ("strict", "standard", "extended", "permanent")]}
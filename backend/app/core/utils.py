@@ -1,29 +1,56 @@
 import os
 import smtplib
+from dataclasses import dataclass
 from email.message import EmailMessage
 
 
-def send_auth_code_email(email: str, code: str) -> bool:
+@dataclass(frozen=True)
+class SmtpSettings:
+    host: str
+    port: int
+    user: str
+    password: str
+    sender: str
+    use_tls: bool
+
+
+def get_smtp_settings() -> SmtpSettings | None:
+    """SMTP settings from the environment, or None when sending is not configured."""
     host = os.getenv("SMTP_HOST")
     user = os.getenv("SMTP_USER")
     password = os.getenv("SMTP_PASSWORD")
     sender = os.getenv("SMTP_FROM", user or "")
-    port = int(os.getenv("SMTP_PORT", "587"))
-    use_tls = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
-
     if not host or not user or not password or not sender:
+        return None
+    return SmtpSettings(
+        host=host,
+        port=int(os.getenv("SMTP_PORT", "587")),
+        user=user,
+        password=password,
+        sender=sender,
+        use_tls=os.getenv("SMTP_USE_TLS", "true").lower() == "true",
+    )
+
+
+def smtp_configured() -> bool:
+    return get_smtp_settings() is not None
+
+
+def send_auth_code_email(email: str, code: str) -> bool:
+    settings = get_smtp_settings()
+    if settings is None:
         return False
 
     msg = EmailMessage()
     msg["Subject"] = "Код входа в Crawler"
-    msg["From"] = sender
+    msg["From"] = settings.sender
     msg["To"] = email
     msg.set_content(f"Ваш код входа: {code}\nКод действует ограниченное время.")
 
-    with smtplib.SMTP(host, port, timeout=10) as server:
-        if use_tls:
+    with smtplib.SMTP(settings.host, settings.port, timeout=10) as server:
+        if settings.use_tls:
             server.starttls()
-        server.login(user, password)
+        server.login(settings.user, settings.password)
         server.send_message(msg)
 
     return True
@@ -1,23 +1,25 @@
 from datetime import datetime
 
-from sqlalchemy import JSON, DateTime, ForeignKey, String, Text
+from sqlalchemy import JSON, Enum, ForeignKey, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
+from app.db.types import UTCDateTime
 
 
 class EventFeed(Base):
     __tablename__ = "event_feed"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    event_type: Mapped[str] = mapped_column(String(64), index=True)
-    channel: Mapped[str] = mapped_column(String(20), index=True)
-    severity: Mapped[str] = mapped_column(String(20), index=True, default="info")
+    event_type: Mapped[str] = mapped_column(String(64))
+    channel: Mapped[str] = mapped_column(Enum("notification", "action", name="event_channel"))
+    severity: Mapped[str] = mapped_column(Enum("info", "warning", "danger", name="event_severity"), default="info")
     title: Mapped[str] = mapped_column(String(160))
     body: Mapped[str | None] = mapped_column(Text, nullable=True)
     target_path: Mapped[str | None] = mapped_column(String(255), nullable=True)
     target_ref: Mapped[str | None] = mapped_column(String(255), nullable=True)
     actor_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
-    target_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
-    meta_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    target_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    meta_json: Mapped[dict | None] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime, server_default=func.now())
@@ -21,9 +21,11 @@ from app.core.metrics import increment_counter, prometheus_text, snapshot_metric
 from app.core.monitoring_cache import get_metrics_snapshot_ttl_seconds, get_or_set_cached
 from app.core.export_utils import csv_attachment_response, xlsx_attachment_response
 from app.core.monitoring_anomaly import run_monitoring_anomaly_loop
+from app.core.rate_limit import close_rate_limit_client
 from app.core.security import require_permission
 from app.db.models.user import User
 from app.db.session import SessionLocal
+from app.services.admin_monitoring import close_prometheus_client
 
 logger = logging.getLogger(__name__)
 if not logging.getLogger().handlers:
@@ -100,6 +102,8 @@ async def lifespan(_: FastAPI):
             await asyncio.wait_for(anomaly_task, timeout=3)
         except (asyncio.TimeoutError, Exception):
             anomaly_task.cancel()
+    close_prometheus_client()
+    close_rate_limit_client()
 
 
 app = FastAPI(title="Crawler API", lifespan=lifespan)
@@ -163,6 +167,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             message=message,
             details=detail,
         ),
+        headers=exc.headers,
     )
 
 
@@ -1,5 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import timedelta
-from app.core.admin_sync import is_root_admin_email
+from app.core.admin_sync import get_runtime_admin_email_set, normalize_email
 from app.core.security import (
     LOGIN_CODE_EXPIRE_MINUTES,
     generate_login_code,
@@ -8,6 +10,20 @@ from app.core.security import (
 )
 from app.db.models.user import User
 
+ROOT_ADMIN_ALLOWED_FOR_ADMIN_USER_ACTIONS = frozenset({
+    "remove_approve",
+    "block",
+    "unblock",
+    "revoke_sessions",
+    "revoke_trusted_devices",
+    "send_code",
+    "set_trust_policy",
+    "set_role",
+    "delete_soft",
+    "restore",
+    "delete_hard",
+})
+
 
 def is_bulk_action_allowed_for_actor(
     *,
@@ -15,29 +31,23 @@ def is_bulk_action_allowed_for_actor(
     user: User,
     action: str,
     role: str | None = None,
+    root_admin_emails: frozenset[str] | None = None,
+    actor_role: str | None = None,
 ) -> tuple[bool, str | None]:
-    actor_role = get_user_role(actor)
+    # Callers checking many (user, action) pairs pass one root-admin set and the actor's role
+    # for the whole request.
+    if root_admin_emails is None:
+        root_admin_emails = get_runtime_admin_email_set()
+    if actor_role is None:
+        actor_role = get_user_role(actor)
     is_root_actor = actor_role == "root-admin"
-    root_admin_allowed_for_admin_user = {
-        "remove_approve",
-        "block",
-        "unblock",
-        "revoke_sessions",
-        "revoke_trusted_devices",
-        "send_code",
-        "set_trust_policy",
-        "set_role",
-        "delete_soft",
-        "restore",
-        "delete_hard",
-    }
-
+    is_root_target = normalize_email(user.email) in root_admin_emails
     if action == "set_role":
         if not user.is_approved or user.is_deleted:
             return False, "Role can be changed only for active approved users"
         if user.id == actor.id and role in {"viewer", "editor"}:
             return False, "Cannot downgrade your own role"
-        if is_root_admin_email(user.email):
+        if is_root_target:
             return False, "Cannot change role for root-admin"
         if user.is_admin and not is_root_actor:
             return False, "Only root-admin can change role for admin user"
@@ -54,14 +64,14 @@ def is_bulk_action_allowed_for_actor(
     if action == "delete_hard":
         if user.id == actor.id:
             return False, "Cannot hard delete yourself"
-        if is_root_admin_email(user.email):
+        if is_root_target:
             return False, "Cannot hard delete root-admin"
         return True, None
 
     if user.is_admin:
-        if is_root_admin_email(user.email):
+        if is_root_target:
             return False, "Cannot apply this action to root-admin"
-        if is_root_actor and action in root_admin_allowed_for_admin_user:
+        if is_root_actor and action in ROOT_ADMIN_ALLOWED_FOR_ADMIN_USER_ACTIONS:
             return True, None
         return False, "Admin user is skipped"
 
@@ -72,7 +82,7 @@ from fastapi import HTTPException, Request
 from sqlalchemy.orm import Session
 
 from app.core.event_catalog import admin_action_event_meta
-from app.core.events import emit_event, utc_now_naive
+from app.core.events import build_event, utc_now_naive
 from app.core.metrics import increment_counter
 from app.core.observability import log_business_event
 from app.core.utils import send_auth_code_email
@@ -89,66 +99,116 @@ def _client_ip(request: Request) -> str | None:
     return None
 
 
+@dataclass
+class AdminActionEntry:
+    action: str
+    target_user_id: int | None = None
+    target_email: str | None = None
+    meta_json: dict | None = None
+
+
+def log_admin_actions(
+    *,
+    db: Session,
+    request: Request,
+    actor: User,
+    entries: list[AdminActionEntry],
+    security_actions: frozenset[str],
+    logger,
+    created_at,
+) -> None:
+    """Write audit rows and their action events for a batch of admin actions.
+
+    All audit rows go out in one flush (ids come back via multi-row INSERT ... RETURNING);
+    the events referencing them are only added and are written by the caller's commit.
+    """
+    if not entries:
+        return
+    ip = _client_ip(request)
+    user_agent = request.headers.get("user-agent", "")[:255] or None
+    log_entries = [
+        AdminAuditLog(
+            actor_user_id=actor.id,
+            target_user_id=entry.target_user_id,
+            action=entry.action,
+            meta_json=entry.meta_json,
+            ip=ip,
+            user_agent=user_agent,
+            created_at=created_at,
+        )
+        for entry in entries
+    ]
+    db.add_all(log_entries)
+    db.flush()
+
+    for entry, log_entry in zip(entries, log_entries):
+        event_meta = admin_action_event_meta(entry.action)
+        target_email = entry.target_email or "-"
+        db.add(
+            build_event(
+                event_type=event_meta["event_type"],
+                channel=event_meta["channel"],
+                severity=event_meta["severity"],
+                title=event_meta["title"],
+                body=f"{actor.email} -> {target_email}",
+                target_path=None,
+                target_ref=f"log_id:{log_entry.id}",
+                actor_user_id=actor.id,
+                target_user_id=entry.target_user_id,
+                meta_json={
+                    "action": entry.action,
+                    "audit_log_id": log_entry.id,
+                    "target_email": target_email,
+                    "security": entry.action in security_actions,
+                    "related_target_path": (
+                        f"/users?highlight_user_id={entry.target_user_id}" if entry.target_user_id else None
+                    ),
+                    **(entry.meta_json or {}),
+                },
+            )
+        )
+        increment_counter("admin_action_total", action=entry.action)
+        log_business_event(
+            logger,
+            request,
+            event="admin.action",
+            action=entry.action,
+            actor_email=actor.email,
+            target_email=target_email,
+        )
+
+
 def log_admin_action(
     *,
     db: Session,
     request: Request,
     actor: User,
     action: str,
-    security_actions: set[str],
+    security_actions: frozenset[str],
     logger,
     target_user_id: int | None = None,
     meta_json: dict | None = None,
     created_at,
 ) -> None:
-    log_entry = AdminAuditLog(
-        actor_user_id=actor.id,
-        target_user_id=target_user_id,
-        action=action,
-        meta_json=meta_json,
-        ip=_client_ip(request),
-        user_agent=request.headers.get("user-agent", "")[:255] or None,
-        created_at=created_at,
-    )
-    db.add(log_entry)
-    db.flush()
-
     target_user = db.get(User, target_user_id) if target_user_id else None
-    event_meta = admin_action_event_meta(action)
-    target_email = target_user.email if target_user else "-"
-
-    emit_event(
-        db,
-        event_type=event_meta["event_type"],
-        channel=event_meta["channel"],
-        severity=event_meta["severity"],
-        title=event_meta["title"],
-        body=f"{actor.email} -> {target_email}",
-        target_path=None,
-        target_ref=f"log_id:{log_entry.id}",
-        actor_user_id=actor.id,
-        target_user_id=target_user_id,
-        meta_json={
-            "action": action,
-            "audit_log_id": log_entry.id,
-            "target_email": target_email,
-            "security": action in security_actions,
-            "related_target_path": f"/users?highlight_user_id={target_user_id}" if target_user_id else None,
-            **(meta_json or {}),
-        },
-    )
-    increment_counter("admin_action_total", action=action)
-    log_business_event(
-        logger,
-        request,
-        event="admin.action",
-        action=action,
-        actor_email=actor.email,
-        target_email=target_email,
+    log_admin_actions(
+        db=db,
+        request=request,
+        actor=actor,
+        entries=[
+            AdminActionEntry(
+                action=action,
+                target_user_id=target_user_id,
+                target_email=target_user.email if target_user else None,
+                meta_json=meta_json,
+            )
+        ],
+        security_actions=security_actions,
+        logger=logger,
+        created_at=created_at,
     )
 
 
-
 def require_reason(reason: str | None) -> str:
     value = (reason or "").strip()
     if not value:
@@ -156,23 +216,48 @@ def require_reason(reason: str | None) -> str:
     return value
 
 
-def send_login_code_for_user(db: Session, user: User) -> dict:
-    code = generate_login_code()
-    challenge = LoginCode(
-        user_id=user.id,
-        code_hash=hash_login_code(code),
-        expires_at=utc_now_naive() + timedelta(minutes=LOGIN_CODE_EXPIRE_MINUTES),
-        used_at=None,
-        attempts=0,
-    )
-    db.add(challenge)
+# smtplib is blocking; bulk sends overlap their SMTP round-trips on a small pool.
+LOGIN_CODE_EMAIL_WORKERS = 8
+
+
+def send_login_codes_for_users(db: Session, users: list[User]) -> dict[int, dict]:
+    """Issue a login code per user; returns send results keyed by user id.
+
+    All challenges are inserted and committed together before any email goes out.
+    """
+    if not users:
+        return {}
+    expires_at = utc_now_naive() + timedelta(minutes=LOGIN_CODE_EXPIRE_MINUTES)
+    codes = [generate_login_code() for _ in users]
+    challenges = [
+        LoginCode(
+            user_id=user.id,
+            code_hash=hash_login_code(code),
+            expires_at=expires_at,
+            used_at=None,
+            attempts=0,
+        )
+        for user, code in zip(users, codes)
+    ]
+    db.add_all(challenges)
+    db.flush()
+    # Read ids/emails before commit expires the instances, otherwise each access reloads a row.
+    targets = [(user.id, user.email, challenge.id) for user, challenge in zip(users, challenges)]
     db.commit()
-    db.refresh(challenge)
 
-    sent = send_auth_code_email(user.email, code)
+    emails = [email for _, email, _ in targets]
+    if len(targets) == 1:
+        sent_flags = [send_auth_code_email(emails[0], codes[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(LOGIN_CODE_EMAIL_WORKERS, len(targets))) as pool:
+            sent_flags = list(pool.map(send_auth_code_email, emails, codes))
+
     return {
-        "user_id": user.id,
-        "email": user.email,
-        "sent": sent,
-        "challenge_id": challenge.id,
+        user_id: {
+            "user_id": user_id,
+            "email": email,
+            "sent": sent,
+            "challenge_id": challenge_id,
+        }
+        for (user_id, email, challenge_id), sent in zip(targets, sent_flags)
     }
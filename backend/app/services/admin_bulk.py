@@ -1,7 +1,10 @@
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Callable, Literal
+from functools import lru_cache
+from typing import Any, Callable, Literal
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.db.models.admin_audit_log import AdminAuditLog
@@ -187,6 +190,7 @@ ACTION_CATALOG: dict[str, dict] = {
 }
 
 
+@lru_cache(maxsize=2)
 def bulk_action_catalog_payload(*, include_admin_role: bool = False) -> dict:
     role_meta = dict(ACTION_CATALOG["approve"].get("approve_roles", {}))
     if not include_admin_role:
@@ -248,15 +252,14 @@ def available_actions_for_user(user: User) -> set[BulkAction]:
     return actions
 
 
+def order_bulk_actions(actions: set[str]) -> list[BulkAction]:
+    return [a for a in ACTION_CATALOG.keys() if a in actions]
+
+
 def available_actions_for_users(users: list[User]) -> list[BulkAction]:
     if not users:
         return []
-    per_user = [available_actions_for_user(u) for u in users]
-    if not per_user:
-        return []
-    union_actions = set().union(*per_user)
-    ordered = [a for a in ACTION_CATALOG.keys() if a in union_actions]
-    return ordered
+    return order_bulk_actions(set().union(*(available_actions_for_user(u) for u in users)))
 
 
 def _handle_approve(*, user: User, payload: BulkActionPayload, log_action: Callable[[str, User, dict | None], None], **_) -> dict:
@@ -297,26 +300,59 @@ def _handle_revoke_sessions(*, user: User, payload: BulkActionPayload, log_actio
 
 
 def _handle_revoke_trusted_devices(*, db: Session, user: User, payload: BulkActionPayload, log_action: Callable[[str, User, dict | None], None], **_) -> dict:
+    return _handle_revoke_trusted_devices_batch(db=db, users=[user], payload=payload, log_action=log_action)[user.id]
+
+
+def _handle_revoke_trusted_devices_batch(*, db: Session, users: list[User], payload: BulkActionPayload, log_action: Callable[[str, User, dict | None], None], **_) -> dict[int, dict]:
+    # One UPDATE for every selected user; RETURNING user_id doubles as the per-user count.
     now = _utc_now_naive()
-    revoked_count = (
-        db.query(TrustedDevice)
-        .filter(TrustedDevice.user_id == user.id, TrustedDevice.revoked_at.is_(None))
-        .update({TrustedDevice.revoked_at: now}, synchronize_session=False)
-    )
-    log_action("revoke_trusted_devices", user, _with_reason({"revoked_count": int(revoked_count)}, payload.reason))
-    return {"ok": True, "action": "revoke_trusted_devices"}
+    revoked_user_ids = db.execute(
+        update(TrustedDevice)
+        .where(TrustedDevice.user_id.in_([u.id for u in users]), TrustedDevice.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .returning(TrustedDevice.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    revoked_count_by_user_id = Counter(revoked_user_ids)
+
+    outcomes: dict[int, dict] = {}
+    for user in users:
+        revoked_count = revoked_count_by_user_id.get(user.id, 0)
+        log_action("revoke_trusted_devices", user, _with_reason({"revoked_count": revoked_count}, payload.reason))
+        outcomes[user.id] = {"ok": True, "action": "revoke_trusted_devices"}
+    return outcomes
 
 
 def _handle_send_code(*, db: Session, user: User, payload: BulkActionPayload, log_action: Callable[[str, User, dict | None], None], send_login_code: Callable[[Session, User], dict], **_) -> dict:
-    if not user.is_approved or user.is_blocked:
-        return {"ok": False, "detail": "User is not allowed to login"}
-    send_result = send_login_code(db, user)
-    log_action(
-        "send_code",
-        user,
-        _with_reason({"challenge_id": send_result["challenge_id"], "sent": send_result["sent"]}, payload.reason),
-    )
-    return {"ok": True, "action": "send_code", **send_result}
+    return _handle_send_code_batch(
+        db=db,
+        users=[user],
+        payload=payload,
+        log_action=log_action,
+        send_login_codes=lambda session, users: {u.id: send_login_code(session, u) for u in users},
+    )[user.id]
+
+
+def _handle_send_code_batch(*, db: Session, users: list[User], payload: BulkActionPayload, log_action: Callable[[str, User, dict | None], None], send_login_codes: Callable[[Session, list[User]], dict[int, dict]], **_) -> dict[int, dict]:
+    # Codes for every allowed user are inserted in one commit and emailed as one batch.
+    outcomes: dict[int, dict] = {}
+    allowed_users: list[User] = []
+    for user in users:
+        if not user.is_approved or user.is_blocked:
+            outcomes[user.id] = {"ok": False, "detail": "User is not allowed to login"}
+        else:
+            allowed_users.append(user)
+
+    send_results = send_login_codes(db, allowed_users) if allowed_users else {}
+    for user in allowed_users:
+        send_result = send_results[user.id]
+        log_action(
+            "send_code",
+            user,
+            _with_reason({"challenge_id": send_result["challenge_id"], "sent": send_result["sent"]}, payload.reason),
+        )
+        outcomes[user.id] = {"ok": True, "action": "send_code", **send_result}
+    return outcomes
 
 
 def _handle_set_trust_policy(*, user: User, payload: BulkActionPayload, log_action: Callable[[str, User, dict | None], None], **_) -> dict:
@@ -394,6 +430,53 @@ def _handle_delete_hard(*, db: Session, user: User, payload: BulkActionPayload,
     return {"ok": True, "action": "delete_hard"}
 
 
+def _pending_approval_criteria(user_ids: list[int]) -> tuple:
+    return (
+        User.id.in_(user_ids),
+        User.is_admin.is_(False),
+        User.is_approved.is_(False),
+        User.is_deleted.is_(False),
+    )
+
+
+def load_pending_approval_candidates(db: Session, user_ids: list[int]) -> list[Any]:
+    """Pending users eligible for approval, as column rows: the old role and email for the audit
+    entry plus the flags the actor policy check reads. No ORM instances are built."""
+    if not user_ids:
+        return []
+    return (
+        db.query(User.id, User.email, User.role, User.is_admin, User.is_approved, User.is_deleted)
+        .filter(*_pending_approval_criteria(user_ids))
+        .all()
+    )
+
+
+def approve_pending_users(
+    db: Session,
+    *,
+    user_ids: list[int],
+    role: Literal["editor", "viewer"],
+) -> list[int]:
+    """Approve ``user_ids`` with one UPDATE ... RETURNING; returns the ids actually updated.
+
+    Eligibility is re-checked in the WHERE clause, so rows changed since the candidates were
+    loaded are skipped. "fetch" keeps User instances already in the session in sync.
+    """
+    if not user_ids:
+        return []
+    return (
+        db.execute(
+            update(User)
+            .where(*_pending_approval_criteria(user_ids))
+            .values(role=role, is_admin=False, is_approved=True, is_blocked=False)
+            .returning(User.id)
+            .execution_options(synchronize_session="fetch")
+        )
+        .scalars()
+        .all()
+    )
+
+
 ACTION_HANDLERS: dict[str, Callable[..., dict]] = {
     "approve": _handle_approve,
     "remove_approve": _handle_remove_approve,
@@ -410,6 +493,13 @@ ACTION_HANDLERS: dict[str, Callable[..., dict]] = {
 }
 
 
+# Actions whose whole selection is applied with set-based statements instead of per-user handlers.
+BATCH_ACTION_HANDLERS: dict[str, Callable[..., dict[int, dict]]] = {
+    "revoke_trusted_devices": _handle_revoke_trusted_devices_batch,
+    "send_code": _handle_send_code_batch,
+}
+
+
 def execute_bulk_action_for_user(
     *,
     db: Session,
@@ -429,3 +519,35 @@ def execute_bulk_action_for_user(
         log_action=log_action,
         send_login_code=send_login_code,
     )
+
+
+def execute_bulk_action_for_users(
+    *,
+    db: Session,
+    users: list[User],
+    payload: BulkActionPayload,
+    log_action: Callable[[str, User, dict | None], None],
+    send_login_codes: Callable[[Session, list[User]], dict[int, dict]],
+) -> dict[int, dict]:
+    """Apply one bulk action to already-validated users; returns outcomes keyed by user id."""
+    if not users:
+        return {}
+    batch_handler = BATCH_ACTION_HANDLERS.get(payload.action)
+    if batch_handler:
+        return batch_handler(
+            db=db,
+            users=users,
+            payload=payload,
+            log_action=log_action,
+            send_login_codes=send_login_codes,
+        )
+    return {
+        user.id: execute_bulk_action_for_user(
+            db=db,
+            user=user,
+            payload=payload,
+            log_action=log_action,
+            send_login_code=lambda session, target: send_login_codes(session, [target])[target.id],
+        )
+        for user in users
+    }
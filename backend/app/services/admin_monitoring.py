@@ -1,13 +1,13 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import httpx
 
 from app.core.monitoring_cache import (
-    get_cached,
     get_monitoring_history_ttl_seconds,
-    set_cached,
+    get_or_build_single_flight,
 )
 from app.core.monitoring_settings import get_monitoring_settings, update_monitoring_settings
 
@@ -35,6 +35,28 @@ def _prometheus_base_url() -> str:
     return os.getenv("PROMETHEUS_URL", "http://prometheus:9090").rstrip("/")
 
 
+# One pooled client per process, so range queries reuse keep-alive connections. httpx.Client is
+# thread-safe, so sync endpoints can share it.
+_prometheus_client: httpx.Client | None = None
+
+
+def _get_prometheus_client() -> httpx.Client:
+    global _prometheus_client
+    if _prometheus_client is None or _prometheus_client.is_closed:
+        _prometheus_client = httpx.Client(
+            timeout=8.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+    return _prometheus_client
+
+
+def close_prometheus_client() -> None:
+    global _prometheus_client
+    if _prometheus_client is not None:
+        _prometheus_client.close()
+        _prometheus_client = None
+
+
 def _query_prometheus_range(
     *,
     query: str,
@@ -42,19 +64,23 @@ def _query_prometheus_range(
     end_ts: int,
     step_seconds: int,
 ) -> list[dict[str, float]]:
+    if end_ts - start_ts < step_seconds:
+        # query_range evaluates at start, start + step, ... <= end: a window shorter than one
+        # step is a single evaluation at start, which an instant query returns more cheaply.
+        return _query_prometheus_instant(query=query, ts=start_ts)
+
     url = f"{_prometheus_base_url()}/api/v1/query_range"
-    with httpx.Client(timeout=8.0) as client:
-        response = client.get(
-            url,
-            params={
-                "query": query,
-                "start": str(start_ts),
-                "end": str(end_ts),
-                "step": str(step_seconds),
-            },
-        )
-        response.raise_for_status()
-        payload = response.json()
+    response = _get_prometheus_client().get(
+        url,
+        params={
+            "query": query,
+            "start": str(start_ts),
+            "end": str(end_ts),
+            "step": str(step_seconds),
+        },
+    )
+    response.raise_for_status()
+    payload = response.json()
 
     data = payload.get("data", {})
     results = data.get("result", [])
@@ -75,8 +101,66 @@ def _query_prometheus_range(
     return points
 
 
+def _query_prometheus_instant(*, query: str, ts: int) -> list[dict[str, float]]:
+    response = _get_prometheus_client().get(
+        f"{_prometheus_base_url()}/api/v1/query",
+        params={"query": query, "time": str(ts)},
+    )
+    response.raise_for_status()
+    payload = response.json()
+
+    results = payload.get("data", {}).get("result", [])
+    if not results:
+        return []
+    item = results[0].get("value", [])
+    if not isinstance(item, list) or len(item) != 2:
+        return []
+    try:
+        return [{"ts": float(item[0]), "value": float(item[1])}]
+    except (TypeError, ValueError):
+        return []
+
+
+def _query_prometheus_range_many(
+    queries: dict[str, str],
+    *,
+    start_ts: int,
+    end_ts: int,
+    step_seconds: int,
+) -> dict[str, list[dict[str, float]]]:
+    # Prometheus has no multi-query endpoint; issuing the range queries concurrently over the
+    # shared pooled client makes a dashboard render cost the slowest query, not their sum.
+    # Any failed query re-raises from map(), same as the sequential loop did.
+    if not queries:
+        return {}
+
+    def run(query: str) -> list[dict[str, float]]:
+        return _query_prometheus_range(
+            query=query,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            step_seconds=step_seconds,
+        )
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        results = list(pool.map(run, queries.values()))
+    return dict(zip(queries.keys(), results))
+
+
 def _prometheus_escape_label_value(value: str) -> str:
-    return value.replace("\\", "\\\\").replace('"', '\\"')
+    # PromQL label values are double-quoted strings: backslash first, then quote and newline.
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Dashboard series: response key -> PromQL. Fixed per process, so built once at import.
+MONITORING_HISTORY_QUERIES: dict[str, str] = {
+    "http_requests": "(sum(http_requests_total) or vector(0))",
+    "http_errors": "(sum(http_errors_total) or vector(0))",
+    "auth_starts": "(sum(auth_start_total) or vector(0))",
+    "admin_actions": "(sum(admin_action_total) or vector(0))",
+    "events_center": "(sum(events_center_total) or vector(0))",
+    "invalid_code": '(sum(auth_verify_result_total{result="invalid_code"}) or vector(0))',
+}
 
 
 def get_monitoring_history_payload(
@@ -90,51 +174,36 @@ def get_monitoring_history_payload(
     end_ts = int(time.time())
     start_ts = end_ts - safe_range * 60
 
-    queries = {
-        "http_requests": "(sum(http_requests_total) or vector(0))",
-        "http_errors": "(sum(http_errors_total) or vector(0))",
-        "auth_starts": "(sum(auth_start_total) or vector(0))",
-        "admin_actions": "(sum(admin_action_total) or vector(0))",
-        "events_center": "(sum(events_center_total) or vector(0))",
-        "invalid_code": '(sum(auth_verify_result_total{result="invalid_code"}) or vector(0))',
-    }
-
     cache_key = f"monitoring:history:v1:range={safe_range}:step={safe_step}"
-    if not force_refresh:
-        cached = get_cached(cache_key)
-        if cached is not None:
-            return cached
 
-    try:
-        series = {
-            key: _query_prometheus_range(
-                query=query,
+    def build() -> tuple[dict, int]:
+        try:
+            series = _query_prometheus_range_many(
+                MONITORING_HISTORY_QUERIES,
                 start_ts=start_ts,
                 end_ts=end_ts,
                 step_seconds=safe_step,
             )
-            for key, query in queries.items()
-        }
-        payload = {
-            "enabled": True,
-            "source": "prometheus",
-            "range_minutes": safe_range,
-            "step_seconds": safe_step,
-            "series": series,
-        }
-        set_cached(cache_key, payload, get_monitoring_history_ttl_seconds())
-        return payload
-    except Exception as exc:
-        payload = {
-            "enabled": False,
-            "source": "prometheus",
-            "range_minutes": safe_range,
-            "step_seconds": safe_step,
-            "series": {k: [] for k in queries.keys()},
-            "error": str(exc),
-        }
-        set_cached(cache_key, payload, max(1, get_monitoring_history_ttl_seconds() // 2))
-        return payload
+            payload = {
+                "enabled": True,
+                "source": "prometheus",
+                "range_minutes": safe_range,
+                "step_seconds": safe_step,
+                "series": series,
+            }
+            return payload, get_monitoring_history_ttl_seconds()
+        except Exception as exc:
+            payload = {
+                "enabled": False,
+                "source": "prometheus",
+                "range_minutes": safe_range,
+                "step_seconds": safe_step,
+                "series": {key: [] for key in MONITORING_HISTORY_QUERIES},
+                "error": str(exc),
+            }
+            return payload, max(1, get_monitoring_history_ttl_seconds() // 2)
+
+    return get_or_build_single_flight(cache_key, build, force_refresh=force_refresh)
 
 
 def get_monitoring_focus_history_payload(
@@ -154,45 +223,39 @@ def get_monitoring_focus_history_payload(
     if not safe_metric_name:
         raise ValueError("metric_name is required")
 
-    label_filter = ""
-    if metric_path and metric_path.strip():
-        esc_path = _prometheus_escape_label_value(metric_path.strip())
-        label_filter = f'{{path="{esc_path}"}}'
-
-    promql = f"sum({safe_metric_name}{label_filter})"
     path_key = (metric_path or "").strip()
     cache_key = f"monitoring:focus:v1:metric={safe_metric_name}:path={path_key}:range={safe_range}:step={safe_step}"
-    if not force_refresh:
-        cached = get_cached(cache_key)
-        if cached is not None:
-            return cached
 
-    try:
-        points = _query_prometheus_range(
-            query=promql,
-            start_ts=start_ts,
-            end_ts=end_ts,
-            step_seconds=safe_step,
-        )
-        payload = {
-            "enabled": True,
-            "source": "prometheus",
-            "range_minutes": safe_range,
-            "step_seconds": safe_step,
-            "query": promql,
-            "series": points,
-        }
-        set_cached(cache_key, payload, get_monitoring_history_ttl_seconds())
-        return payload
-    except Exception as exc:
-        payload = {
-            "enabled": False,
-            "source": "prometheus",
-            "range_minutes": safe_range,
-            "step_seconds": safe_step,
-            "query": promql,
-            "series": [],
-            "error": str(exc),
-        }
-        set_cached(cache_key, payload, max(1, get_monitoring_history_ttl_seconds() // 2))
-        return payload
+    def build() -> tuple[dict, int]:
+        # The query is only composed on a rebuild; cache hits never escape or format it.
+        label_filter = f'{{path="{_prometheus_escape_label_value(path_key)}"}}' if path_key else ""
+        promql = f"sum({safe_metric_name}{label_filter})"
+        try:
+            points = _query_prometheus_range(
+                query=promql,
+                start_ts=start_ts,
+                end_ts=end_ts,
+                step_seconds=safe_step,
+            )
+            payload = {
+                "enabled": True,
+                "source": "prometheus",
+                "range_minutes": safe_range,
+                "step_seconds": safe_step,
+                "query": promql,
+                "series": points,
+            }
+            return payload, get_monitoring_history_ttl_seconds()
+        except Exception as exc:
+            payload = {
+                "enabled": False,
+                "source": "prometheus",
+                "range_minutes": safe_range,
+                "step_seconds": safe_step,
+                "query": promql,
+                "series": [],
+                "error": str(exc),
+            }
+            return payload, max(1, get_monitoring_history_ttl_seconds() // 2)
+
+    return get_or_build_single_flight(cache_key, build, force_refresh=force_refresh)
@@ -1,18 +1,79 @@
 from datetime import datetime, timezone
-from typing import Literal
+from functools import lru_cache
+from typing import Any, Literal
 
 from fastapi import HTTPException
-from sqlalchemy import and_, func
-from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, literal, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import distinct_on
+from sqlalchemy.orm import Bundle, Session, aliased
 
-from app.core.events import ensure_event_states, utc_now_naive
+from app.core.events import utc_now_naive
 from app.db.models.auth_attempt import AuthAttempt
 from app.db.models.admin_audit_log import AdminAuditLog
 from app.db.models.event_feed import EventFeed
+from app.db.models.event_user_state import EventUserState
 from app.db.models.login_history import LoginHistory
 from app.db.models.trusted_device import TrustedDevice
 from app.db.models.user import User
 
+# List/export rows are plain column tuples (attribute access by name): no ORM instances,
+# identity-map bookkeeping or change tracking for read-only pages.
+LOGIN_HISTORY_LIST_COLUMNS = (
+    LoginHistory.id,
+    LoginHistory.user_id,
+    LoginHistory.email,
+    LoginHistory.ip,
+    LoginHistory.user_agent,
+    LoginHistory.result,
+    LoginHistory.source,
+    LoginHistory.created_at,
+)
+ADMIN_AUDIT_DETAILS_COLUMNS = (
+    AdminAuditLog.id,
+    AdminAuditLog.created_at,
+    AdminAuditLog.action,
+    AdminAuditLog.meta_json,
+    AdminAuditLog.ip,
+)
+
+
+def _parse_iso_filter(value: str, field: str) -> datetime | None:
+    raw = value.strip()
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid {field} format (use ISO)") from exc
+
+
+def parse_list_cursor(cursor: str) -> tuple[datetime, int] | None:
+    """Decode a ``<created_at ISO>,<id>`` keyset cursor; empty means first page."""
+    raw = cursor.strip()
+    if not raw:
+        return None
+    ts_raw, _, id_raw = raw.rpartition(",")
+    try:
+        created_at, row_id = datetime.fromisoformat(ts_raw), int(id_raw)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at, row_id
+
+
+def encode_list_cursor(row: Any) -> str:
+    return f"{row.created_at.isoformat()},{row.id}"
+
+
+def apply_list_cursor(query, *, created_col, id_col, cursor: tuple[datetime, int], sort_dir: Literal["desc", "asc"]):
+    # Seek past the last row of the previous page on the same (created_at, id) order the
+    # builders sort by. Bounds take the columns' types so e.g. UTCDateTime binds the cursor as UTC.
+    key = tuple_(created_col, id_col)
+    bound = tuple_(literal(cursor[0], created_col.type), literal(cursor[1], id_col.type))
+    return query.filter(key < bound if sort_dir == "desc" else key > bound)
+
 
 def build_login_history_query(
     db: Session,
@@ -26,36 +87,63 @@ def build_login_history_query(
     date_to: str,
     sort_dir: Literal["desc", "asc"],
 ):
-    query = db.query(LoginHistory)
+    criteria = []
     if user_id is not None:
-        query = query.filter(LoginHistory.user_id == user_id)
+        criteria.append(LoginHistory.user_id == user_id)
     if email.strip():
-        query = query.filter(LoginHistory.email.ilike(f"%{email.strip()}%"))
+        criteria.append(LoginHistory.email.ilike(f"%{email.strip()}%"))
     if ip.strip():
-        query = query.filter(LoginHistory.ip.ilike(f"%{ip.strip()}%"))
+        criteria.append(LoginHistory.ip.ilike(f"%{ip.strip()}%"))
     if result.strip():
-        query = query.filter(LoginHistory.result == result.strip())
+        criteria.append(LoginHistory.result == result.strip())
     if source.strip():
-        query = query.filter(LoginHistory.source == source.strip())
-    if date_from.strip():
-        try:
-            from_dt = datetime.fromisoformat(date_from.strip())
-        except ValueError as exc:
-            raise HTTPException(
-                status_code=400, detail="Invalid date_from format (use ISO)") from exc
-        query = query.filter(LoginHistory.created_at >= from_dt)
-    if date_to.strip():
-        try:
-            to_dt = datetime.fromisoformat(date_to.strip())
-        except ValueError as exc:
-            raise HTTPException(
-                status_code=400, detail="Invalid date_to format (use ISO)") from exc
-        query = query.filter(LoginHistory.created_at <= to_dt)
+        criteria.append(LoginHistory.source == source.strip())
+    from_dt = _parse_iso_filter(date_from, "date_from")
+    if from_dt is not None:
+        criteria.append(LoginHistory.created_at >= from_dt)
+    to_dt = _parse_iso_filter(date_to, "date_to")
+    if to_dt is not None:
+        criteria.append(LoginHistory.created_at <= to_dt)
 
     order_created = LoginHistory.created_at.desc(
     ) if sort_dir == "desc" else LoginHistory.created_at.asc()
     order_id = LoginHistory.id.desc() if sort_dir == "desc" else LoginHistory.id.asc()
-    return query.order_by(order_created, order_id)
+    return db.query(*LOGIN_HISTORY_LIST_COLUMNS).filter(*criteria).order_by(order_created, order_id)
+
+
+@lru_cache(maxsize=4)
+def _sorted_action_values(actions: frozenset[str]) -> tuple[str, ...]:
+    # Callers pass the same module-level frozenset every request: sort it once, not per query.
+    return tuple(sorted(actions))
+
+
+def _audit_log_criteria(
+    *,
+    action: str,
+    security_only: bool,
+    date_from: str,
+    date_to: str,
+    security_actions: frozenset[str],
+) -> list:
+    criteria = []
+    action_filter = action.strip()
+    if security_only:
+        criteria.append(AdminAuditLog.action.in_(_sorted_action_values(security_actions)))
+    if action_filter:
+        criteria.append(AdminAuditLog.action.ilike(f"%{action_filter}%"))
+    from_dt = _parse_iso_filter(date_from, "date_from")
+    if from_dt is not None:
+        criteria.append(AdminAuditLog.created_at >= from_dt)
+    to_dt = _parse_iso_filter(date_to, "date_to")
+    if to_dt is not None:
+        criteria.append(AdminAuditLog.created_at <= to_dt)
+    return criteria
+
+
+def _email_or_placeholder_ilike(email_col, placeholder: str, pattern: str):
+    # Same rows as coalesce(email, placeholder) ILIKE pattern, but keeps a bare email ILIKE that the
+    # users trigram index can serve; the literal branch is constant-folded by the planner.
+    return or_(email_col.ilike(pattern), and_(email_col.is_(None), literal(placeholder).ilike(pattern)))
 
 
 def build_audit_rows_query(
@@ -68,7 +156,7 @@ def build_audit_rows_query(
     date_from: str,
     date_to: str,
     sort_dir: Literal["desc", "asc"],
-    security_actions: set[str],
+    security_actions: frozenset[str],
 ):
     actor_user = aliased(User)
     target_user = aliased(User)
@@ -76,7 +164,28 @@ def build_audit_rows_query(
     actor_expr = func.coalesce(actor_user.email, "system")
     target_expr = func.coalesce(target_user.email, "-")
 
-    query = (
+    actor_filter = actor_email.strip()
+    target_filter = target_email.strip()
+
+    criteria = []
+    if actor_filter:
+        criteria.append(_email_or_placeholder_ilike(actor_user.email, "system", f"%{actor_filter}%"))
+    if target_filter:
+        criteria.append(_email_or_placeholder_ilike(target_user.email, "-", f"%{target_filter}%"))
+    criteria.extend(
+        _audit_log_criteria(
+            action=action,
+            security_only=security_only,
+            date_from=date_from,
+            date_to=date_to,
+            security_actions=security_actions,
+        )
+    )
+
+    order_created = AdminAuditLog.created_at.desc(
+    ) if sort_dir == "desc" else AdminAuditLog.created_at.asc()
+    order_id = AdminAuditLog.id.desc() if sort_dir == "desc" else AdminAuditLog.id.asc()
+    return (
         db.query(
             AdminAuditLog.id.label("id"),
             AdminAuditLog.created_at.label("created_at"),
@@ -88,106 +197,138 @@ def build_audit_rows_query(
         )
         .outerjoin(actor_user, actor_user.id == AdminAuditLog.actor_user_id)
         .outerjoin(target_user, target_user.id == AdminAuditLog.target_user_id)
+        .filter(*criteria)
+        .order_by(order_created, order_id)
     )
 
-    action_filter = action.strip()
+
+def count_audit_rows(
+    db: Session,
+    *,
+    action: str,
+    actor_email: str,
+    target_email: str,
+    security_only: bool,
+    date_from: str,
+    date_to: str,
+    security_actions: frozenset[str],
+) -> int:
+    """Count rows matching build_audit_rows_query filters.
+
+    Users are joined only when an email filter needs them: the outer joins never change the
+    row count, so an unfiltered total stays a plain scan of admin_audit_logs.
+    """
+    query = db.query(func.count(AdminAuditLog.id))
+
     actor_filter = actor_email.strip()
     target_filter = target_email.strip()
 
-    if security_only:
-        query = query.filter(AdminAuditLog.action.in_(list(security_actions)))
-    if action_filter:
-        query = query.filter(AdminAuditLog.action.ilike(f"%{action_filter}%"))
+    criteria = []
     if actor_filter:
-        query = query.filter(actor_expr.ilike(f"%{actor_filter}%"))
+        actor_user = aliased(User)
+        query = query.outerjoin(actor_user, actor_user.id == AdminAuditLog.actor_user_id)
+        criteria.append(_email_or_placeholder_ilike(actor_user.email, "system", f"%{actor_filter}%"))
     if target_filter:
-        query = query.filter(target_expr.ilike(f"%{target_filter}%"))
-    if date_from.strip():
-        try:
-            from_dt = datetime.fromisoformat(date_from.strip())
-        except ValueError as exc:
-            raise HTTPException(
-                status_code=400, detail="Invalid date_from format (use ISO)") from exc
-        query = query.filter(AdminAuditLog.created_at >= from_dt)
-    if date_to.strip():
-        try:
-            to_dt = datetime.fromisoformat(date_to.strip())
-        except ValueError as exc:
-            raise HTTPException(
-                status_code=400, detail="Invalid date_to format (use ISO)") from exc
-        query = query.filter(AdminAuditLog.created_at <= to_dt)
+        target_user = aliased(User)
+        query = query.outerjoin(target_user, target_user.id == AdminAuditLog.target_user_id)
+        criteria.append(_email_or_placeholder_ilike(target_user.email, "-", f"%{target_filter}%"))
+    criteria.extend(
+        _audit_log_criteria(
+            action=action,
+            security_only=security_only,
+            date_from=date_from,
+            date_to=date_to,
+            security_actions=security_actions,
+        )
+    )
+    return int(query.filter(*criteria).scalar() or 0)
 
-    order_created = AdminAuditLog.created_at.desc(
-    ) if sort_dir == "desc" else AdminAuditLog.created_at.asc()
-    order_id = AdminAuditLog.id.desc() if sort_dir == "desc" else AdminAuditLog.id.asc()
-    return query.order_by(order_created, order_id)
 
+def _latest_rows_per_group(db: Session, model, group_col, *criteria):
+    """Subquery with the latest (highest id) row of ``model`` per ``group_col`` value.
 
-def build_last_login_map(db: Session, user_ids: list[int]) -> dict[int, LoginHistory]:
-    last_login_by_user_id: dict[int, LoginHistory] = {}
-    if not user_ids:
-        return last_login_by_user_id
-    subq = (
-        db.query(
-            LoginHistory.user_id.label("user_id"),
-            func.max(LoginHistory.id).label("max_id"),
+    Postgres uses DISTINCT ON, which walks a (group, id DESC) index once; other dialects
+    (sqlite in tests) rank rows with row_number() instead.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return (
+            select(model)
+            .ext(distinct_on(group_col))
+            .where(*criteria)
+            .order_by(group_col, model.id.desc())
+            .subquery()
         )
-        .filter(LoginHistory.user_id.in_(user_ids))
-        .group_by(LoginHistory.user_id)
+    ranked = (
+        select(
+            model,
+            func.row_number().over(partition_by=group_col, order_by=model.id.desc()).label("rn"),
+        )
+        .where(*criteria)
         .subquery()
     )
-    rows = (
-        db.query(LoginHistory)
-        .join(subq, and_(LoginHistory.user_id == subq.c.user_id, LoginHistory.id == subq.c.max_id))
-        .all()
-    )
-    for row in rows:
-        if row.user_id is None:
-            continue
-        if row.user_id not in last_login_by_user_id:
-            last_login_by_user_id[row.user_id] = row
-    return last_login_by_user_id
+    return select(ranked).where(ranked.c.rn == 1).subquery()
 
 
-def build_trust_summary_map(db: Session, user_ids: list[int]) -> dict[int, dict[str, float | int | None]]:
-    summary: dict[int, dict[str, float | int | None]] = {}
-    if not user_ids:
-        return summary
+def build_user_aux_maps(
+    db: Session,
+    user_ids: list[int],
+) -> tuple[dict[int, Any], dict[int, dict[str, float | int | None]]]:
+    """Return (last login by user id, trust summary by user id) from a single round-trip.
 
-    now = utc_now_naive()
-    rows = (
-        db.query(TrustedDevice)
+    The latest login row per user and the active-device aggregates come from two subqueries
+    outer-joined to the selected users, so users without history or devices are simply absent
+    from the corresponding map.
+    """
+    last_login_by_user_id: dict[int, Any] = {}
+    trust_summary_by_user_id: dict[int, dict[str, float | int | None]] = {}
+    if not user_ids:
+        return last_login_by_user_id, trust_summary_by_user_id
+
+    latest = _latest_rows_per_group(db, LoginHistory, LoginHistory.user_id, LoginHistory.user_id.in_(user_ids))
+    # Only the snapshot fields are projected; the bundle row keeps attribute access.
+    latest_login = Bundle("last_login", latest.c.created_at, latest.c.ip, latest.c.user_agent)
+    # count(expires_at) skips NULLs, so a lower value than count(id) means the user has at
+    # least one permanent (never-expiring) device.
+    trust = (
+        db.query(
+            TrustedDevice.user_id.label("user_id"),
+            func.count(TrustedDevice.id).label("devices_count"),
+            func.count(TrustedDevice.expires_at).label("expiring_count"),
+            func.max(TrustedDevice.expires_at).label("max_expires_at"),
+        )
         .filter(TrustedDevice.user_id.in_(user_ids), TrustedDevice.revoked_at.is_(None))
+        .group_by(TrustedDevice.user_id)
+        .subquery()
+    )
+    rows = (
+        db.query(
+            User.id,
+            latest_login,
+            trust.c.devices_count,
+            trust.c.expiring_count,
+            trust.c.max_expires_at,
+        )
+        .select_from(User)
+        .outerjoin(latest, latest.c.user_id == User.id)
+        .outerjoin(trust, trust.c.user_id == User.id)
+        .filter(User.id.in_(user_ids))
         .all()
     )
-    max_exp_by_user: dict[int, datetime] = {}
-    permanent_by_user: set[int] = set()
-    for row in rows:
-        if row.user_id is None:
-            continue
-        entry = summary.setdefault(
-            row.user_id, {"trusted_days_left": None, "trusted_devices_count": 0})
-        entry["trusted_devices_count"] = int(
-            entry["trusted_devices_count"] or 0) + 1
-
-        if row.expires_at is None:
-            permanent_by_user.add(row.user_id)
-            continue
-        current_max = max_exp_by_user.get(row.user_id)
-        if current_max is None or row.expires_at > current_max:
-            max_exp_by_user[row.user_id] = row.expires_at
 
-    for uid, entry in summary.items():
-        if uid in permanent_by_user:
-            entry["trusted_days_left"] = -1.0
-            continue
-        max_exp = max_exp_by_user.get(uid)
-        if max_exp is None:
-            entry["trusted_days_left"] = None
+    now = utc_now_naive()
+    for uid, last_login, devices_count, expiring_count, max_exp in rows:
+        if last_login.created_at is not None:
+            last_login_by_user_id[uid] = last_login
+        if devices_count is None:
             continue
-        delta_days = (max_exp - now).total_seconds() / 86400
-        entry["trusted_days_left"] = round(max(delta_days, 0), 1)
-    return summary
+        if expiring_count < devices_count:
+            days_left = -1.0
+        elif max_exp is None:
+            days_left = None
+        else:
+            days_left = round(max((max_exp - now).total_seconds() / 86400, 0), 1)
+        trust_summary_by_user_id[uid] = {"trusted_days_left": days_left, "trusted_devices_count": int(devices_count)}
+    return last_login_by_user_id, trust_summary_by_user_id
 
 
 def load_active_trusted_devices_for_user(db: Session, user_id: int) -> list[TrustedDevice]:
@@ -199,39 +340,44 @@ def load_active_trusted_devices_for_user(db: Session, user_id: int) -> list[Trus
     )
 
 
-def load_recent_login_history_for_user(db: Session, user_id: int, *, limit: int = 200) -> list[LoginHistory]:
+def load_recent_login_history_for_user(db: Session, user_id: int, *, limit: int = 200) -> list[Any]:
     return (
-        db.query(LoginHistory)
+        db.query(*LOGIN_HISTORY_LIST_COLUMNS)
         .filter(LoginHistory.user_id == user_id)
         .order_by(LoginHistory.created_at.desc(), LoginHistory.id.desc())
         .limit(limit)
         .all()
     )
 
-def count_login_history_result_since(
+def count_login_history_risk_signals(
     db: Session,
     user_id: int,
     *,
     result: str,
     since: datetime,
-) -> int:
-    return int(
-        db.query(LoginHistory)
-        .filter(
+    ip: str | None,
+) -> tuple[int, int]:
+    """Return (rows with ``result`` since ``since``, rows from ``ip`` capped at 2) in one query.
+
+    The IP count only has to tell "seen once" from "seen before", so it stops after two rows
+    instead of counting the user's whole history.
+    """
+    result_count = (
+        select(func.count())
+        .where(
             LoginHistory.user_id == user_id,
             LoginHistory.result == result,
             LoginHistory.created_at >= since,
         )
-        .count()
-    )
-
-
-def count_login_history_ip_occurrences(db: Session, user_id: int, *, ip: str) -> int:
-    return int(
-        db.query(LoginHistory)
-        .filter(LoginHistory.user_id == user_id, LoginHistory.ip == ip)
-        .count()
+        .scalar_subquery()
     )
+    if ip:
+        ip_rows = select(LoginHistory.id).where(LoginHistory.user_id == user_id, LoginHistory.ip == ip).limit(2)
+        ip_count = select(func.count()).select_from(ip_rows.subquery()).scalar_subquery()
+    else:
+        ip_count = literal(0)
+    invalid_count, ip_seen = db.query(result_count, ip_count).one()
+    return int(invalid_count or 0), int(ip_seen or 0)
 
 
 def load_trusted_devices_for_user(db: Session, user_id: int, *, limit: int = 30) -> list[TrustedDevice]:
@@ -244,9 +390,9 @@ def load_trusted_devices_for_user(db: Session, user_id: int, *, limit: int = 30)
     )
 
 
-def load_recent_admin_audit_for_user(db: Session, user_id: int, *, limit: int = 10) -> list[AdminAuditLog]:
+def load_recent_admin_audit_for_user(db: Session, user_id: int, *, limit: int = 10) -> list[Any]:
     return (
-        db.query(AdminAuditLog)
+        db.query(*ADMIN_AUDIT_DETAILS_COLUMNS)
         .filter(AdminAuditLog.target_user_id == user_id)
         .order_by(AdminAuditLog.created_at.desc(), AdminAuditLog.id.desc())
         .limit(limit)
@@ -263,61 +409,57 @@ def load_latest_request_access_requested_at_by_email(
     if not lower_emails:
         return {}
 
-    attempts_subq = (
-        db.query(
-            func.lower(AuthAttempt.email).label("email"),
-            func.max(AuthAttempt.id).label("max_id"),
-        )
+    email_key = func.lower(AuthAttempt.email)
+    rows = (
+        db.query(email_key, func.max(AuthAttempt.created_at))
         .filter(
             AuthAttempt.action == "request_access",
-            func.lower(AuthAttempt.email).in_(lower_emails),
-        )
-        .group_by(func.lower(AuthAttempt.email))
-        .subquery()
-    )
-    attempts = (
-        db.query(AuthAttempt)
-        .join(
-            attempts_subq,
-            and_(
-                func.lower(AuthAttempt.email) == attempts_subq.c.email,
-                AuthAttempt.id == attempts_subq.c.max_id,
-            ),
+            email_key.in_(lower_emails),
         )
+        .group_by(email_key)
         .all()
     )
-    requested_at_by_email: dict[str, str] = {}
-    for row in attempts:
-        email_key = (row.email or "").strip().lower()
-        if email_key and email_key not in requested_at_by_email:
-            requested_at_by_email[email_key] = row.created_at.isoformat()
-    return requested_at_by_email
+    return {
+        email: requested_at.isoformat()
+        for email, requested_at in rows
+        if email and requested_at is not None
+    }
+
 
+def load_latest_pending_access_events_for_users(
+    db: Session,
+    user_ids: list[int],
+    *,
+    state_user_id: int,
+):
+    """Latest access-request event per user, with ``state_user_id``'s read/dismissed flags.
 
-def load_latest_pending_access_events_for_users(db: Session, user_ids: list[int]) -> list[EventFeed]:
+    The state is outer-joined in the same statement; a missing state row reads as NULL flags,
+    which means the event is still unread for that admin.
+    """
     if not user_ids:
         return []
 
-    pending_events_subq = (
-        db.query(
-            EventFeed.target_user_id.label("user_id"),
-            func.max(EventFeed.id).label("max_id"),
-        )
-        .filter(
+    latest_event = aliased(
+        EventFeed,
+        _latest_rows_per_group(
+            db,
+            EventFeed,
+            EventFeed.target_user_id,
             EventFeed.event_type == "auth.request_access",
             EventFeed.target_user_id.in_(user_ids),
-        )
-        .group_by(EventFeed.target_user_id)
-        .subquery()
+        ),
     )
     return (
-        db.query(EventFeed)
-        .join(
-            pending_events_subq,
-            and_(
-                EventFeed.target_user_id == pending_events_subq.c.user_id,
-                EventFeed.id == pending_events_subq.c.max_id,
-            ),
+        db.query(
+            latest_event.id,
+            latest_event.target_user_id,
+            EventUserState.is_read,
+            EventUserState.is_dismissed,
+        )
+        .outerjoin(
+            EventUserState,
+            and_(EventUserState.event_id == latest_event.id, EventUserState.user_id == state_user_id),
         )
         .all()
     )
@@ -332,7 +474,8 @@ def build_pending_access_flags_for_users(
     """Build pending-unread and latest-pending-event maps for candidate users.
 
     Reuse-first helper: centralizes pending event/state enrichment for list routes
-    and avoids scanning users that cannot have pending access requests.
+    and avoids scanning users that cannot have pending access requests. Read-only: missing
+    state rows are not created here (list routes never commit); the events feed creates them.
     """
     candidate_user_ids = [
         user.id
@@ -342,11 +485,11 @@ def build_pending_access_flags_for_users(
     if not candidate_user_ids:
         return {}, {}
 
-    pending_events = load_latest_pending_access_events_for_users(db, candidate_user_ids)
-    if not pending_events:
-        return {}, {}
-
-    state_map = ensure_event_states(db, user_id=admin_user_id, event_ids=[event.id for event in pending_events])
+    pending_events = load_latest_pending_access_events_for_users(
+        db,
+        candidate_user_ids,
+        state_user_id=admin_user_id,
+    )
     pending_unread_by_user_id: dict[int, bool] = {}
     pending_event_id_by_user_id: dict[int, int | None] = {}
 
@@ -356,19 +499,35 @@ def build_pending_access_flags_for_users(
             continue
         if target_user_id not in pending_event_id_by_user_id:
             pending_event_id_by_user_id[target_user_id] = event.id
-        state = state_map.get(event.id)
-        if state and (not state.is_read) and (not state.is_dismissed):
+        if (not event.is_read) and (not event.is_dismissed):
             pending_unread_by_user_id[target_user_id] = True
 
     return pending_unread_by_user_id, pending_event_id_by_user_id
 
 
-def load_users_by_email_map(db: Session, emails: list[str]) -> dict[str, User]:
+USER_ID_IN_CHUNK = 5000
+
+
+def load_users_by_ids(db: Session, user_ids: list[int]) -> list[User]:
+    """Load users for a selection, deduplicated, with the IN list split into bounded chunks.
+
+    Keeps each statement well under driver/server bind-parameter limits for "select all" bulks.
+    """
+    unique_ids = list(dict.fromkeys(user_ids))
+    users: list[User] = []
+    for start in range(0, len(unique_ids), USER_ID_IN_CHUNK):
+        chunk = unique_ids[start : start + USER_ID_IN_CHUNK]
+        users.extend(db.query(User).filter(User.id.in_(chunk)).all())
+    return users
+
+
+def load_users_by_email_map(db: Session, emails: list[str], columns: tuple = ()) -> dict[str, Any]:
+    """Users keyed by normalized email; ``columns`` projects plain rows instead of User instances."""
     lower_emails = [email.strip().lower()
                     for email in emails if (email or "").strip()]
     if not lower_emails:
         return {}
-    users = db.query(User).filter(
+    users = db.query(*(columns or (User,))).filter(
         func.lower(User.email).in_(lower_emails)).all()
     return {
         (user.email or "").strip().lower(): user
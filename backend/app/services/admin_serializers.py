@@ -1,4 +1,9 @@
+import re
+from bisect import bisect_left
 from collections.abc import Iterable, Iterator
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from typing import Any
 
 from app.core.security import get_user_role
@@ -7,7 +12,9 @@ from app.db.models.trusted_device import TrustedDevice
 from app.db.models.user import User
 
 
-def _serialize_login_history_row(row: LoginHistory) -> dict[str, Any]:
+# List rows are encoded by orjson (success_json_response), which renders naive datetimes
+# exactly like datetime.isoformat() in C, so created_at is passed through unconverted.
+def _serialize_login_history_row(row: Any) -> dict[str, Any]:
     return {
         "id": row.id,
         "user_id": row.user_id,
@@ -16,14 +23,14 @@ def _serialize_login_history_row(row: LoginHistory) -> dict[str, Any]:
         "user_agent": row.user_agent,
         "result": row.result,
         "source": row.source,
-        "created_at": row.created_at.isoformat(),
+        "created_at": row.created_at,
     }
 
 
 def _serialize_audit_row(row: Any) -> dict[str, Any]:
     return {
         "id": row.id,
-        "created_at": row.created_at.isoformat(),
+        "created_at": row.created_at,
         "action": row.action or "",
         "actor_email": row.actor_email,
         "target_email": row.target_email,
@@ -32,7 +39,7 @@ def _serialize_audit_row(row: Any) -> dict[str, Any]:
     }
 
 
-def serialize_login_history_rows(rows: Iterable[LoginHistory]) -> list[dict[str, Any]]:
+def serialize_login_history_rows(rows: Iterable[Any]) -> list[dict[str, Any]]:
     return [_serialize_login_history_row(row) for row in rows]
 
 
@@ -40,27 +47,18 @@ def serialize_audit_rows(rows: Iterable[Any]) -> list[dict[str, Any]]:
     return [_serialize_audit_row(row) for row in rows]
 
 
-def iter_serialized_login_history_rows(rows: Iterable[LoginHistory]) -> Iterator[dict[str, Any]]:
-    for row in rows:
-        yield _serialize_login_history_row(row)
-
-
-def iter_serialized_audit_rows(rows: Iterable[Any]) -> Iterator[dict[str, Any]]:
-    for row in rows:
-        yield _serialize_audit_row(row)
-
-
 def build_user_profile_snapshot(
     *,
     user: User,
-    last_login: LoginHistory | None,
+    last_login: Any | None,
     trust_summary: dict[str, float | int | None] | None = None,
+    root_admin_emails: frozenset[str] | None = None,
 ) -> dict:
     summary = trust_summary or {}
     return {
         "id": user.id,
         "email": user.email,
-        "role": get_user_role(user),
+        "role": get_user_role(user, root_admin_emails=root_admin_emails),
         "is_approved": user.is_approved,
         "is_blocked": user.is_blocked,
         "is_deleted": user.is_deleted,
@@ -73,54 +71,81 @@ def build_user_profile_snapshot(
     }
 
 
+# One scan per UA collects every marker; precedence is then applied to the found set, so
+# e.g. "safari/" still loses to "chrome/" wherever it appears in the string.
+_BROWSER_MARKERS_RE = re.compile(r"edg/|chrome/|firefox/|safari/")
+_PLATFORM_MARKERS_RE = re.compile(r"windows|mac os|macintosh|linux|android|iphone|ios")
+
+
+@lru_cache(maxsize=1024)
 def _detect_device_label(user_agent: str | None) -> str:
     ua = (user_agent or "").lower()
-    browser = "Unknown browser"
-    platform = "Unknown OS"
+    browser_markers = set(_BROWSER_MARKERS_RE.findall(ua))
+    platform_markers = set(_PLATFORM_MARKERS_RE.findall(ua))
 
-    if "edg/" in ua:
+    if "edg/" in browser_markers:
         browser = "Edge"
-    elif "chrome/" in ua and "edg/" not in ua:
+    elif "chrome/" in browser_markers:
         browser = "Chrome"
-    elif "firefox/" in ua:
+    elif "firefox/" in browser_markers:
         browser = "Firefox"
-    elif "safari/" in ua and "chrome/" not in ua:
+    elif "safari/" in browser_markers:
         browser = "Safari"
+    else:
+        browser = "Unknown browser"
 
-    if "windows" in ua:
+    if "windows" in platform_markers:
         platform = "Windows"
-    elif "mac os" in ua or "macintosh" in ua:
+    elif "mac os" in platform_markers or "macintosh" in platform_markers:
         platform = "macOS"
-    elif "linux" in ua:
+    elif "linux" in platform_markers:
         platform = "Linux"
-    elif "android" in ua:
+    elif "android" in platform_markers:
         platform = "Android"
-    elif "iphone" in ua or "ios" in ua:
+    elif "iphone" in platform_markers or "ios" in platform_markers:
         platform = "iOS"
+    else:
+        platform = "Unknown OS"
 
     return f"{browser} / {platform}"
 
 
-def _nearest_history_for_device(device: TrustedDevice, history_rows: list[LoginHistory]) -> LoginHistory | None:
-    if not history_rows:
-        return None
-    candidates = [
-        h
-        for h in history_rows
-        if h.result == "success" and h.source in {"verify_code", "trusted_device"}
-    ]
-    if not candidates:
-        return None
-    return min(candidates, key=lambda h: abs((h.created_at - device.created_at).total_seconds()))
+DEVICE_HINT_SOURCES = frozenset({"verify_code", "trusted_device"})
 
 
+def _device_hint_candidates(history_rows: list[LoginHistory]) -> tuple[list[LoginHistory], list[datetime]]:
+    # Stable sort: among rows with equal created_at the caller's (DESC) order wins.
+    candidates = sorted(
+        (h for h in history_rows if h.result == "success" and h.source in DEVICE_HINT_SOURCES),
+        key=lambda h: h.created_at,
+    )
+    return candidates, [h.created_at for h in candidates]
 
 
+def _nearest_history_for_device(
+    device: TrustedDevice,
+    candidates: list[LoginHistory],
+    candidate_times: list[datetime],
+) -> LoginHistory | None:
+    if not candidates:
+        return None
+    idx = bisect_left(candidate_times, device.created_at)
+    if idx == len(candidates):
+        return candidates[bisect_left(candidate_times, candidate_times[-1])]
+    if idx == 0:
+        return candidates[0]
+    before = bisect_left(candidate_times, candidate_times[idx - 1])
+    if device.created_at - candidate_times[before] < candidate_times[idx] - device.created_at:
+        return candidates[before]
+    return candidates[idx]
+
+
+# User-details rows are encoded by orjson as well (see the list serializers above).
 def serialize_user_details_login_history(rows: Iterable[LoginHistory]) -> list[dict[str, Any]]:
     return [
         {
             "id": row.id,
-            "created_at": row.created_at.isoformat(),
+            "created_at": row.created_at,
             "ip": row.ip,
             "user_agent": row.user_agent,
             "result": row.result,
@@ -134,7 +159,7 @@ def serialize_user_details_admin_actions(rows: Iterable[Any]) -> list[dict[str,
     return [
         {
             "id": row.id,
-            "created_at": row.created_at.isoformat(),
+            "created_at": row.created_at,
             "action": row.action,
             "meta": row.meta_json,
             "ip": row.ip,
@@ -149,8 +174,11 @@ def build_user_details_anomalies(
     invalid_code_24h: int,
     latest_ip_is_new: bool,
 ) -> dict[str, Any]:
-    success_rows = [row for row in login_rows if row.result == "success" and row.user_agent]
-    ua_changed_recently = len(success_rows) >= 2 and success_rows[0].user_agent != success_rows[1].user_agent
+    # Only the two most recent successful logins matter: stop scanning once both are found.
+    recent_success_uas = list(
+        islice((row.user_agent for row in login_rows if row.result == "success" and row.user_agent), 2)
+    )
+    ua_changed_recently = len(recent_success_uas) == 2 and recent_success_uas[0] != recent_success_uas[1]
     return {
         "invalid_code_24h": int(invalid_code_24h),
         "frequent_invalid_code": int(invalid_code_24h) >= 5,
@@ -165,12 +193,13 @@ def serialize_trusted_devices(
     now,
 ) -> list[dict[str, Any]]:
     result: list[dict[str, Any]] = []
+    candidates, candidate_times = _device_hint_candidates(history_rows)
     for device in devices:
-        hint = _nearest_history_for_device(device, history_rows)
+        hint = _nearest_history_for_device(device, candidates, candidate_times)
         hint_ua = hint.user_agent if hint else None
         hint_ip = hint.ip if hint else None
         hint_source = hint.source if hint else None
-        hint_seen_at = hint.created_at.isoformat() if hint else None
+        hint_seen_at = hint.created_at if hint else None
         hint_label = _detect_device_label(hint_ua)
 
         if device.revoked_at is not None:
@@ -190,10 +219,10 @@ def serialize_trusted_devices(
             {
                 "id": device.id,
                 "policy": device.policy,
-                "created_at": device.created_at.isoformat(),
-                "expires_at": device.expires_at.isoformat() if device.expires_at else None,
-                "last_used_at": device.last_used_at.isoformat() if device.last_used_at else None,
-                "revoked_at": device.revoked_at.isoformat() if device.revoked_at else None,
+                "created_at": device.created_at,
+                "expires_at": device.expires_at,
+                "last_used_at": device.last_used_at,
+                "revoked_at": device.revoked_at,
                 "status": status,
                 "days_left": days_left,
                 "device_label": hint_label,
@@ -206,29 +235,32 @@ def serialize_trusted_devices(
     return result
 
 
-def iter_login_history_export_rows(items: Iterable[dict[str, Any]]) -> Iterator[list[Any]]:
-    for row in items:
+# Export rows are built straight from query rows: no per-row dict that is immediately
+# unpacked again into a list. Cells stay ISO strings so CSV and XLSX output is unchanged.
+def iter_login_history_export_rows(rows: Iterable[Any]) -> Iterator[list[Any]]:
+    isoformat = datetime.isoformat
+    for row in rows:
         yield [
-            row.get("id"),
-            row.get("created_at"),
-            row.get("email"),
-            row.get("result"),
-            row.get("source"),
-            row.get("ip") or "",
-            row.get("user_agent") or "",
+            row.id,
+            isoformat(row.created_at),
+            row.email,
+            row.result,
+            row.source,
+            row.ip or "",
+            row.user_agent or "",
         ]
 
 
-def iter_audit_export_rows(items: Iterable[dict[str, Any]]) -> Iterator[list[Any]]:
-    for row in items:
-        meta = row.get("meta")
-        reason = meta.get("reason", "") if isinstance(meta, dict) else ""
+def iter_audit_export_rows(rows: Iterable[Any]) -> Iterator[list[Any]]:
+    isoformat = datetime.isoformat
+    for row in rows:
+        meta = row.meta
         yield [
-            row.get("id"),
-            row.get("created_at"),
-            row.get("action"),
-            row.get("actor_email"),
-            row.get("target_email"),
-            row.get("ip") or "",
-            reason,
+            row.id,
+            isoformat(row.created_at),
+            row.action or "",
+            row.actor_email,
+            row.target_email,
+            row.ip or "",
+            meta.get("reason", "") if isinstance(meta, dict) else "",
         ]
@@ -5,10 +5,12 @@ from app.db.models.user import User
 from app.services.admin_bulk import (
     ACTION_CATALOG,
     BulkActionPayload,
+    approve_pending_users,
     available_actions_for_user,
     available_actions_for_users,
     bulk_action_catalog_payload,
     execute_bulk_action_for_user,
+    execute_bulk_action_for_users,
 )
 
 
@@ -117,6 +119,35 @@ def test_execute_send_code_for_pending_user_is_rejected():
     assert logs == []
 
 
+def test_execute_send_code_for_users_sends_one_batch():
+    pending = _make_user(email="pending@example.com", is_approved=False)
+    first = _make_user(email="first@example.com", is_approved=True)
+    second = _make_user(email="second@example.com", is_approved=True)
+    for idx, user in enumerate((pending, first, second), start=1):
+        user.id = idx
+    batches: list[list[int]] = []
+    logs: list[tuple[str, int, dict | None]] = []
+
+    def send_login_codes(_db, users):
+        batches.append([u.id for u in users])
+        return {u.id: {"user_id": u.id, "email": u.email, "sent": True, "challenge_id": 100 + u.id} for u in users}
+
+    outcomes = execute_bulk_action_for_users(
+        db=None,  # type: ignore[arg-type]
+        users=[pending, first, second],
+        payload=BulkActionPayload(action="send_code", reason="Повторная отправка"),
+        log_action=lambda action, u, meta: logs.append((action, u.id, meta)),
+        send_login_codes=send_login_codes,
+    )
+
+    assert batches == [[first.id, second.id]]
+    assert outcomes[pending.id]["ok"] is False
+    assert outcomes[first.id]["challenge_id"] == 102
+    assert outcomes[second.id]["ok"] is True
+    assert [(action, uid) for action, uid, _ in logs] == [("send_code", first.id), ("send_code", second.id)]
+    assert logs[0][2] == {"challenge_id": 102, "sent": True, "reason": "Повторная отправка"}
+
+
 def test_execute_revoke_trusted_devices_updates_rows_and_reason(db_session):
     user = _make_user(email="u@example.com", is_approved=True)
     db_session.add(user)
@@ -163,6 +194,53 @@ def test_execute_revoke_trusted_devices_updates_rows_and_reason(db_session):
     assert logs[0][1]["revoked_count"] == 2
 
 
+def test_execute_revoke_trusted_devices_for_users_counts_per_user(db_session):
+    first = _make_user(email="first@example.com", is_approved=True)
+    second = _make_user(email="second@example.com", is_approved=True)
+    untouched = _make_user(email="untouched@example.com", is_approved=True)
+    db_session.add_all([first, second, untouched])
+    db_session.commit()
+
+    def _device(user: User, token_hash: str, *, revoked: bool = False) -> TrustedDevice:
+        return TrustedDevice(
+            user_id=user.id,
+            token_hash=token_hash,
+            policy="standard",
+            created_at=_now_naive(),
+            expires_at=None,
+            last_used_at=None,
+            revoked_at=_now_naive() if revoked else None,
+        )
+
+    db_session.add_all(
+        [
+            _device(first, "f1"),
+            _device(first, "f2"),
+            _device(first, "f3", revoked=True),
+            _device(untouched, "u1"),
+        ]
+    )
+    db_session.commit()
+
+    logs: list[tuple[str, int, dict | None]] = []
+    outcomes = execute_bulk_action_for_users(
+        db=db_session,
+        users=[first, second],
+        payload=BulkActionPayload(action="revoke_trusted_devices"),
+        log_action=lambda action, u, meta: logs.append((action, u.id, meta)),
+        send_login_codes=lambda *_: {},
+    )
+    db_session.commit()
+
+    assert outcomes == {
+        first.id: {"ok": True, "action": "revoke_trusted_devices"},
+        second.id: {"ok": True, "action": "revoke_trusted_devices"},
+    }
+    assert {uid: meta["revoked_count"] for _, uid, meta in logs} == {first.id: 2, second.id: 0}
+    active = db_session.query(TrustedDevice).filter(TrustedDevice.revoked_at.is_(None)).all()
+    assert [device.token_hash for device in active] == ["u1"]
+
+
 def test_bulk_action_catalog_reason_mode_is_consistent():
     catalog = bulk_action_catalog_payload(include_admin_role=True)
     actions = {item["action"]: item for item in catalog["actions"]}
@@ -170,3 +248,30 @@ def test_bulk_action_catalog_reason_mode_is_consistent():
     assert actions["set_role"]["reason_mode"] in {"recommended", "optional"}
     assert actions["delete_hard"]["reason_mode"] == "required"
     assert actions["approve"]["reason_mode"] in {"recommended", "optional"}
+
+
+def test_load_users_by_ids_dedupes_and_chunks(db_session, monkeypatch):
+    from app.services import admin_queries
+
+    users = [_make_user(email=f"chunk{idx}@example.com") for idx in range(5)]
+    db_session.add_all(users)
+    db_session.commit()
+    ids = [user.id for user in users]
+
+    monkeypatch.setattr(admin_queries, "USER_ID_IN_CHUNK", 2)
+    loaded = admin_queries.load_users_by_ids(db_session, ids + ids[:2] + [9999])
+
+    assert sorted(user.id for user in loaded) == sorted(ids)
+
+
+def test_approve_pending_users_keeps_session_instances_in_sync(db_session):
+    pending = _make_user(email="pending-sync@example.com")
+    approved = _make_user(email="approved-sync@example.com", is_approved=True)
+    db_session.add_all([pending, approved])
+    db_session.commit()
+
+    updated = approve_pending_users(db_session, user_ids=[pending.id, approved.id], role="editor")
+
+    assert updated == [pending.id]
+    assert pending.is_approved is True
+    assert pending.role == "editor"
@@ -1,18 +1,24 @@
-﻿import os
+﻿import io
+import os
 import tempfile
 from collections.abc import Generator
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from fastapi.testclient import TestClient
+from openpyxl import load_workbook
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.core.security import create_access_token
+from app.api.auth import AUTH_START_LIMIT
+from app.core.security import create_access_token, hash_login_code, hash_trusted_device_token
 from app.db import models  # noqa: F401
 from app.db.base import Base
 from app.db.models.admin_audit_log import AdminAuditLog
+from app.db.models.auth_attempt import AuthAttempt
 from app.db.models.event_feed import EventFeed
+from app.db.models.event_user_state import EventUserState
+from app.db.models.login_code import LoginCode
 from app.db.models.login_history import LoginHistory
 from app.db.models.trusted_device import TrustedDevice
 from app.db.models.user import User
@@ -134,6 +140,128 @@ def test_http_errors_metric_includes_404_status():
     engine.dispose()
 
 
+
+def test_auth_start_rate_limit_counts_attempts_without_redis():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+    prev_redis_url = os.environ.pop("REDIS_URL", None)
+    try:
+        client = TestClient(app)
+        for _ in range(AUTH_START_LIMIT):
+            response = client.post("/auth/start", json={"email": "limited@test.local"})
+            assert response.status_code == 200
+            assert _extract_success_data(response)["status"] == "not_found"
+
+        response = client.post("/auth/start", json={"email": "limited@test.local"})
+        assert response.status_code == 429
+        assert _extract_error_payload(response)["error"]["code"] == "http_429"
+
+        with SessionLocal() as db:
+            attempts = db.query(AuthAttempt).filter(AuthAttempt.action == "auth_start").count()
+            assert attempts == AUTH_START_LIMIT
+    finally:
+        if prev_redis_url is not None:
+            os.environ["REDIS_URL"] = prev_redis_url
+        app.dependency_overrides.clear()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+
+def test_auth_start_sends_login_code_email_after_response(monkeypatch):
+    from app.api import auth as auth_api
+    from app.core.metrics import snapshot_metrics
+
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+    for key, value in {
+        "SMTP_HOST": "smtp.test.local",
+        "SMTP_USER": "mailer@test.local",
+        "SMTP_PASSWORD": "secret",
+    }.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+    with SessionLocal() as db:
+        db.add(_make_user(email="code-mail@test.local", role="viewer", is_admin=False, is_approved=True))
+        db.commit()
+
+    sent: list[str] = []
+
+    def _fake_send(email: str, code: str) -> bool:
+        sent.append(email)
+        if len(sent) > 1:
+            raise OSError("smtp down")
+        return True
+
+    monkeypatch.setattr(auth_api, "send_auth_code_email", _fake_send)
+    client = TestClient(app)
+    for _ in range(2):
+        response = client.post("/auth/start", json={"email": "code-mail@test.local"})
+        assert response.status_code == 200
+        data = _extract_success_data(response)
+        assert data["status"] == "code_sent"
+        assert data["challenge_id"]
+        assert "dev_code" not in data
+    assert sent == ["code-mail@test.local", "code-mail@test.local"]
+    metrics = snapshot_metrics().get("auth_code_email_failed_total", [])
+    assert any(row.get("labels", {}).get("reason") == "smtp_error" for row in metrics)
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+def test_verify_code_resolves_challenge_and_user_together():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        user = _make_user(email="verify@test.local", role="viewer", is_admin=False, is_approved=True)
+        user.trust_policy = "standard"
+        db.add(user)
+        db.commit()
+        challenge = LoginCode(
+            user_id=user.id,
+            code_hash=hash_login_code("123456"),
+            expires_at=datetime.utcnow() + timedelta(minutes=5),
+            used_at=None,
+            attempts=0,
+        )
+        db.add(challenge)
+        db.commit()
+        challenge_id = challenge.id
+
+    client = TestClient(app)
+    response = client.post("/auth/verify-code", json={"challenge_id": challenge_id + 100, "code": "123456"})
+    assert response.status_code == 400
+
+    response = client.post("/auth/verify-code", json={"challenge_id": challenge_id, "code": "000000"})
+    assert response.status_code == 400
+    with SessionLocal() as db:
+        assert db.get(LoginCode, challenge_id).attempts == 1
+
+    response = client.post("/auth/verify-code", json={"challenge_id": challenge_id, "code": "123456"})
+    assert response.status_code == 200
+    data = _extract_success_data(response)
+    assert data["access_token"]
+    with SessionLocal() as db:
+        device = db.query(TrustedDevice).one()
+        assert device.token_hash == hash_trusted_device_token(data["trusted_device_token"])
+        assert device.policy == "standard"
+
+    response = client.post("/auth/verify-code", json={"challenge_id": challenge_id, "code": "123456"})
+    assert response.status_code == 400
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
 def test_available_bulk_available_consistency():
     engine, SessionLocal = _get_session_factory()
     app.router.on_startup.clear()
@@ -188,6 +316,95 @@ def test_available_bulk_available_consistency():
     engine.dispose()
 
 
+def test_approve_bulk_updates_only_pending_users_with_audit():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-approve@test.local", role="admin", is_admin=True, is_approved=True)
+        pending_a = _make_user(email="pending-a@test.local", role="viewer", is_approved=False)
+        pending_b = _make_user(email="pending-b@test.local", role="viewer", is_approved=False)
+        approved = _make_user(email="approved@test.local", role="viewer", is_approved=True)
+        db.add_all([admin, pending_a, pending_b, approved])
+        db.commit()
+        ids = [pending_a.id, pending_b.id, approved.id]
+
+    client = TestClient(app)
+    response = client.post(
+        "/admin/users/approve-bulk",
+        json={"user_ids": [*ids, ids[0], 9999], "role": "editor", "reason": "Проверены"},
+        headers=_auth_header("admin-approve@test.local", role="admin"),
+    )
+    assert response.status_code == 200
+    data = _extract_success_data(response)
+    assert [row["user_id"] for row in data["results"]] == [*ids, 9999]
+    ok_by_user = {row["user_id"]: row["ok"] for row in data["results"]}
+    assert ok_by_user == {ids[0]: True, ids[1]: True, ids[2]: False, 9999: False}
+
+    with SessionLocal() as db:
+        for uid in ids[:2]:
+            updated = db.get(User, uid)
+            assert updated.is_approved is True
+            assert updated.role == "editor"
+        logs = db.query(AdminAuditLog).filter(AdminAuditLog.action == "approve").all()
+        assert sorted(log.target_user_id for log in logs) == ids[:2]
+        assert all((log.meta_json or {}).get("reason") == "Проверены" for log in logs)
+        assert all((log.meta_json or {}).get("old_role") == "viewer" for log in logs)
+        events = db.query(EventFeed).filter(EventFeed.event_type == "admin.approve").all()
+        assert sorted((event.meta_json or {}).get("audit_log_id") for event in events) == sorted(log.id for log in logs)
+        assert {(event.meta_json or {}).get("target_email") for event in events} == {
+            "pending-a@test.local",
+            "pending-b@test.local",
+        }
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_bulk_users_logs_audit_and_event_per_target():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-bulk-block@test.local", role="admin", is_admin=True, is_approved=True)
+        targets = [
+            _make_user(email=f"block-{idx}@test.local", role="viewer", is_approved=True)
+            for idx in range(3)
+        ]
+        db.add_all([admin, *targets])
+        db.commit()
+        ids = [target.id for target in targets]
+
+    client = TestClient(app)
+    response = client.post(
+        "/admin/users/bulk",
+        json={"user_ids": ids, "action": "block", "reason": "Подозрительная активность"},
+        headers=_auth_header("admin-bulk-block@test.local", role="admin"),
+    )
+    assert response.status_code == 200
+    assert all(row["ok"] for row in _extract_success_data(response)["results"])
+
+    with SessionLocal() as db:
+        logs = db.query(AdminAuditLog).filter(AdminAuditLog.action == "block").all()
+        assert sorted(log.target_user_id for log in logs) == ids
+        events = db.query(EventFeed).filter(EventFeed.event_type == "admin.block").all()
+        assert sorted((e.meta_json or {}).get("audit_log_id") for e in events) == sorted(log.id for log in logs)
+        assert {(e.meta_json or {}).get("target_email") for e in events} == {
+            "block-0@test.local",
+            "block-1@test.local",
+            "block-2@test.local",
+        }
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
 def test_root_admin_can_set_role_to_admin_via_bulk():
     prev_admin_emails = os.environ.get("ADMIN_EMAILS")
     os.environ["ADMIN_EMAILS"] = "root@test.local"
@@ -354,6 +571,165 @@ def test_user_details_contains_security_context():
     engine.dispose()
 
 
+def test_user_details_risk_signals_match_in_memory_and_sql_paths(monkeypatch):
+    from datetime import timedelta
+
+    from app.api import admin as admin_api
+
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-risk@test.local", role="admin", is_admin=True, is_approved=True)
+        target = _make_user(email="target-risk@test.local", role="viewer", is_admin=False, is_approved=True)
+        db.add_all([admin, target])
+        db.commit()
+        rows = [
+            ("10.0.0.1", "invalid_code", now - timedelta(hours=30)),
+            ("10.0.0.1", "invalid_code", now - timedelta(hours=2)),
+            ("10.0.0.1", "invalid_code", now - timedelta(hours=1)),
+            ("10.0.0.7", "success", now - timedelta(minutes=5)),
+        ]
+        db.add_all([
+            LoginHistory(user_id=target.id, email=target.email, ip=ip, result=result, source="verify_code", created_at=ts)
+            for ip, result, ts in rows
+        ])
+        db.commit()
+        target_id = target.id
+
+    client = TestClient(app)
+    headers = _auth_header("admin-risk@test.local", role="admin")
+    expected = {"invalid_code_24h": 2, "frequent_invalid_code": False, "latest_ip_is_new": True}
+    for limit in (200, 2):
+        # 200 loads the whole history (in-memory path); 2 forces the SQL aggregate path.
+        monkeypatch.setattr(admin_api, "LOGIN_HISTORY_DETAILS_LIMIT", limit)
+        response = client.get(f"/admin/users/{target_id}/details", headers=headers)
+        assert response.status_code == 200
+        anomalies = _extract_success_data(response)["anomalies"]
+        assert {key: anomalies[key] for key in expected} == expected
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_revoke_trusted_devices_except_one_keeps_latest_or_requested_device():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-revoke-except@test.local", role="admin", is_admin=True, is_approved=True)
+        target = _make_user(email="target-revoke-except@test.local", role="viewer", is_admin=False, is_approved=True)
+        empty = _make_user(email="empty-revoke-except@test.local", role="viewer", is_admin=False, is_approved=True)
+        db.add_all([admin, target, empty])
+        db.commit()
+        devices = [
+            TrustedDevice(
+                user_id=target.id,
+                token_hash=f"keep-{idx}",
+                policy="standard",
+                created_at=datetime(2026, 1, 1),
+                expires_at=None,
+                last_used_at=datetime(2026, 1, 1 + idx),
+                revoked_at=datetime(2026, 1, 9) if idx == 3 else None,
+            )
+            for idx in range(4)
+        ]
+        db.add_all(devices)
+        db.commit()
+        target_id, empty_id = target.id, empty.id
+        latest_active_id, revoked_id = devices[2].id, devices[3].id
+
+    client = TestClient(app)
+    headers = _auth_header("admin-revoke-except@test.local", role="admin")
+    url = f"/admin/users/{target_id}/trusted-devices/revoke-except"
+
+    response = client.post(url, json={"keep_device_id": revoked_id}, headers=headers)
+    assert response.status_code == 400
+
+    response = client.post(url, json={}, headers=headers)
+    assert response.status_code == 200
+    data = _extract_success_data(response)
+    assert data["keep_device_id"] == latest_active_id
+    assert data["revoked_count"] == 2
+
+    response = client.post(url, json={"keep_device_id": latest_active_id}, headers=headers)
+    assert _extract_success_data(response)["revoked_count"] == 0
+
+    response = client.post(
+        f"/admin/users/{empty_id}/trusted-devices/revoke-except",
+        json={"keep_device_id": latest_active_id},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert _extract_success_data(response) == {"ok": True, "revoked_count": 0, "keep_device_id": None}
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+
+def test_revoke_trusted_devices_batch_revokes_only_active_devices_of_user():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-revoke-batch@test.local", role="admin", is_admin=True, is_approved=True)
+        target = _make_user(email="target-revoke-batch@test.local", role="viewer", is_admin=False, is_approved=True)
+        other = _make_user(email="other-revoke-batch@test.local", role="viewer", is_admin=False, is_approved=True)
+        db.add_all([admin, target, other])
+        db.commit()
+        devices = [
+            TrustedDevice(
+                user_id=owner.id,
+                token_hash=f"batch-{idx}",
+                policy="standard",
+                created_at=datetime(2026, 1, 1),
+                expires_at=None,
+                last_used_at=datetime(2026, 1, 1),
+                revoked_at=datetime(2026, 1, 9) if idx == 2 else None,
+            )
+            for idx, owner in enumerate([target, target, target, target, other])
+        ]
+        db.add_all(devices)
+        db.commit()
+        target_id = target.id
+        device_ids = [device.id for device in devices]
+
+    client = TestClient(app)
+    headers = _auth_header("admin-revoke-batch@test.local", role="admin")
+    url = f"/admin/users/{target_id}/trusted-devices/revoke-batch"
+
+    assert client.post(url, json={"device_ids": []}, headers=headers).status_code == 400
+
+    response = client.post(url, json={"device_ids": device_ids[:3] + device_ids[4:] + device_ids[:1]}, headers=headers)
+    assert response.status_code == 200
+    data = _extract_success_data(response)
+    assert data["revoked_count"] == 2
+    assert data["device_ids"] == device_ids[:2]
+
+    with SessionLocal() as db:
+        active = {d.id for d in db.query(TrustedDevice).filter(TrustedDevice.revoked_at.is_(None))}
+        assert active == {device_ids[3], device_ids[4]}
+        logs = db.query(AdminAuditLog).filter(AdminAuditLog.action == "revoke_trusted_devices_batch").all()
+        assert len(logs) == 1
+        assert logs[0].meta_json["device_ids"] == device_ids[:2]
+
+    response = client.post(url, json={"device_ids": device_ids[:2]}, headers=headers)
+    assert _extract_success_data(response) == {"ok": True, "revoked_count": 0, "device_ids": []}
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
 def test_user_sanity_endpoint_reports_exact_counts():
     engine, SessionLocal = _get_session_factory()
     app.router.on_startup.clear()
@@ -507,6 +883,106 @@ def test_settings_summary_monitoring_state_uses_history_thresholds(monkeypatch):
     engine.dispose()
 
 
+def test_monitoring_history_payload_queries_series_concurrently(monkeypatch):
+    import threading
+
+    from app.services import admin_monitoring
+
+    barrier = threading.Barrier(6, timeout=5)
+
+    def fake_range(*, query, start_ts, end_ts, step_seconds):
+        # Every series query must be in flight at once for the barrier to release.
+        barrier.wait()
+        return [{"ts": float(start_ts), "value": float(len(query))}]
+
+    monkeypatch.setattr(admin_monitoring, "_query_prometheus_range", fake_range)
+    payload = admin_monitoring.get_monitoring_history_payload(
+        range_minutes=5,
+        step_seconds=10,
+        force_refresh=True,
+    )
+
+    assert payload["enabled"] is True
+    assert list(payload["series"]) == [
+        "http_requests",
+        "http_errors",
+        "auth_starts",
+        "admin_actions",
+        "events_center",
+        "invalid_code",
+    ]
+    assert payload["series"]["http_requests"][0]["value"] == float(len("(sum(http_requests_total) or vector(0))"))
+
+
+def test_monitoring_settings_update_keeps_cached_series():
+    from app.core import monitoring_cache
+    from app.core.monitoring_settings import get_monitoring_settings, update_monitoring_settings
+
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        db.add(_make_user(email="admin-mon-settings@test.local", role="admin", is_admin=True, is_approved=True))
+        db.commit()
+
+    key = "monitoring:history:v1:range=60:step=30"
+    monitoring_cache.set_cached(key, {"series": {}}, 30)
+    previous = get_monitoring_settings()
+
+    client = TestClient(app)
+    response = client.post(
+        "/admin/monitoring/settings",
+        json={"warn_error_delta": 2.0, "warn_error_rate": 4.0, "crit_error_delta": 5.0, "crit_error_rate": 12.0},
+        headers=_auth_header("admin-mon-settings@test.local", role="admin"),
+    )
+    assert response.status_code == 200
+    # Thresholds are applied at read time, so cached Prometheus series stay valid.
+    assert monitoring_cache.get_cached(key) == {"series": {}}
+
+    update_monitoring_settings(**previous)
+    monitoring_cache.invalidate_cache_prefix(key)
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_monitoring_cache_single_flight_builds_once_and_serves_stale():
+    import threading
+    import time
+
+    from app.core import monitoring_cache
+
+    key = "monitoring:test:single-flight"
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"n": len(calls)}, 30
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(monitoring_cache.get_or_build_single_flight(key, build)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [{"n": 1}] * 5
+
+    # Expired but within the stale grace: while another caller holds the rebuild, serve stale.
+    monitoring_cache.set_cached(key, {"n": "stale"}, 0)
+    lock = monitoring_cache._key_lock(key)
+    with lock:
+        assert monitoring_cache.get_or_build_single_flight(key, build) == {"n": "stale"}
+    assert monitoring_cache.get_or_build_single_flight(key, build) == {"n": 2}
+    monitoring_cache.invalidate_cache_prefix(key)
+
+
 def test_users_list_include_total_false_returns_null_total():
     engine, SessionLocal = _get_session_factory()
     app.router.on_startup.clear()
@@ -537,6 +1013,84 @@ def test_users_list_include_total_false_returns_null_total():
     engine.dispose()
 
 
+def test_users_list_total_comes_with_page_and_past_last_page():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        db.add(_make_user(email="admin-users-window@test.local", role="admin", is_admin=True, is_approved=True))
+        db.add_all([
+            _make_user(email=f"window-user-{idx}@test.local", role="viewer", is_admin=False, is_approved=True)
+            for idx in range(5)
+        ])
+        db.commit()
+
+    client = TestClient(app)
+    headers = _auth_header("admin-users-window@test.local", role="admin")
+    for page, page_len in ((1, 2), (3, 1), (9, 0)):
+        response = client.get(f"/admin/users?status=approved&q=window-user&page={page}&page_size=2", headers=headers)
+        assert response.status_code == 200
+        data = _extract_success_data(response)
+        assert data["total"] == 5
+        assert len(data["items"]) == page_len
+        assert all("total_count" not in item for item in data["items"])
+
+    response = client.get("/admin/users?status=deleted&page=1&page_size=2", headers=headers)
+    assert _extract_success_data(response)["total"] == 0
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_users_list_uses_latest_login_and_pending_event_per_user():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-users-latest@test.local", role="admin", is_admin=True, is_approved=True)
+        pending = _make_user(email="pending-latest@test.local", role="viewer", is_approved=False)
+        other = _make_user(email="pending-other@test.local", role="viewer", is_approved=False)
+        db.add_all([admin, pending, other])
+        db.commit()
+        db.add_all([
+            LoginHistory(user_id=pending.id, email=pending.email, ip="10.0.0.1", result="code_sent", source="start"),
+            LoginHistory(user_id=pending.id, email=pending.email, ip="10.0.0.2", result="code_sent", source="start"),
+            LoginHistory(user_id=other.id, email=other.email, ip="10.0.0.9", result="code_sent", source="start"),
+        ])
+        events = [
+            EventFeed(event_type="auth.request_access", channel="action", title="Request", target_user_id=uid)
+            for uid in (pending.id, pending.id, other.id)
+        ]
+        db.add_all(events)
+        db.commit()
+        db.add(EventUserState(event_id=events[2].id, user_id=admin.id, is_read=True, is_dismissed=False))
+        db.commit()
+        pending_id, other_id = pending.id, other.id
+        latest_event_id = {pending_id: events[1].id, other_id: events[2].id}
+
+    client = TestClient(app)
+    response = client.get(
+        "/admin/users?status=pending",
+        headers=_auth_header("admin-users-latest@test.local", role="admin"),
+    )
+    assert response.status_code == 200
+    items = {item["id"]: item for item in _extract_success_data(response)}
+    assert items[pending_id]["last_ip"] == "10.0.0.2"
+    assert items[other_id]["last_ip"] == "10.0.0.9"
+    assert {uid: items[uid]["pending_event_id"] for uid in (pending_id, other_id)} == latest_event_id
+    assert items[pending_id]["pending_unread"] is True
+    assert items[other_id]["pending_unread"] is False
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
 def test_audit_list_include_total_false_returns_null_total():
     engine, SessionLocal = _get_session_factory()
     app.router.on_startup.clear()
@@ -578,6 +1132,165 @@ def test_audit_list_include_total_false_returns_null_total():
     engine.dispose()
 
 
+def test_audit_list_total_matches_email_filters():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-audit-count@test.local", role="admin", is_admin=True, is_approved=True)
+        target = _make_user(email="audit-target@test.local")
+        db.add_all([admin, target])
+        db.commit()
+        db.add_all([
+            AdminAuditLog(actor_user_id=admin.id, target_user_id=target.id, action="approve", created_at=datetime.utcnow()),
+            AdminAuditLog(actor_user_id=admin.id, target_user_id=None, action="settings", created_at=datetime.utcnow()),
+            AdminAuditLog(actor_user_id=None, target_user_id=target.id, action="block", created_at=datetime.utcnow()),
+        ])
+        db.commit()
+
+    client = TestClient(app)
+    headers = _auth_header("admin-audit-count@test.local", role="admin")
+    expected_totals = {
+        "": 3,
+        "&actor_email=admin-audit-count": 2,
+        "&actor_email=system": 1,
+        "&target_email=audit-target": 2,
+        "&target_email=-": 3,
+        "&actor_email=admin-audit-count&target_email=audit-target": 1,
+    }
+    for filters, expected in expected_totals.items():
+        response = client.get(f"/admin/audit?page=1&page_size=20{filters}", headers=headers)
+        assert response.status_code == 200
+        data = _extract_success_data(response)
+        assert data["total"] == expected
+        assert len(data["items"]) == expected
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_audit_xlsx_export_streams_workbook_rows():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-audit-xlsx@test.local", role="admin", is_admin=True, is_approved=True)
+        db.add(admin)
+        db.commit()
+        db.add_all([
+            AdminAuditLog(
+                actor_user_id=admin.id,
+                action=f"export_{idx}",
+                created_at=datetime.utcnow(),
+                meta_json={"reason": f"reason {idx}"},
+            )
+            for idx in range(3)
+        ])
+        db.commit()
+
+    client = TestClient(app)
+    response = client.get(
+        "/admin/audit/export.xlsx?sort_dir=asc",
+        headers=_auth_header("admin-audit-xlsx@test.local", role="admin"),
+    )
+    assert response.status_code == 200
+    assert "admin_audit_logs.xlsx" in response.headers["content-disposition"]
+    sheet = load_workbook(io.BytesIO(response.content), read_only=True)["Audit"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == ("id", "created_at", "action", "actor_email", "target_email", "ip", "reason")
+    assert [row[2] for row in rows[1:]] == ["export_0", "export_1", "export_2"]
+    assert rows[1][3] == "admin-audit-xlsx@test.local"
+    assert rows[1][6] == "reason 0"
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_audit_csv_export_streams_all_rows():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-audit-csv@test.local", role="admin", is_admin=True, is_approved=True)
+        db.add(admin)
+        db.commit()
+        db.add_all([
+            AdminAuditLog(actor_user_id=admin.id, action=f"csv_{idx}", created_at=datetime.utcnow())
+            for idx in range(1500)
+        ])
+        db.commit()
+
+    client = TestClient(app)
+    response = client.get(
+        "/admin/audit/export.csv?sort_dir=asc",
+        headers=_auth_header("admin-audit-csv@test.local", role="admin"),
+    )
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0] == "id,created_at,action,actor_email,target_email,ip,reason"
+    assert len(lines) == 1501
+    assert lines[1].split(",")[2] == "csv_0"
+    assert lines[-1].split(",")[2] == "csv_1499"
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_audit_list_sort_dir_pages_in_sql_order():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-audit-sort@test.local", role="admin", is_admin=True, is_approved=True)
+        db.add(admin)
+        db.commit()
+        same_moment = datetime.utcnow()
+        db.add_all([
+            AdminAuditLog(actor_user_id=admin.id, action=f"sort_{idx}", created_at=same_moment)
+            for idx in range(5)
+        ])
+        db.commit()
+
+    client = TestClient(app)
+    headers = _auth_header("admin-audit-sort@test.local", role="admin")
+
+    def _actions(sort_dir: str, page: int) -> list[str]:
+        response = client.get(f"/admin/audit?page={page}&page_size=2&sort_dir={sort_dir}", headers=headers)
+        assert response.status_code == 200
+        return [item["action"] for item in _extract_success_data(response)["items"]]
+
+    # Equal created_at values fall back to id, in the same direction.
+    assert _actions("asc", 1) == ["sort_0", "sort_1"]
+    assert _actions("asc", 3) == ["sort_4"]
+    assert _actions("desc", 1) == ["sort_4", "sort_3"]
+    assert _actions("desc", 3) == ["sort_0"]
+
+    first = _extract_success_data(client.get("/admin/audit?page_size=2&sort_dir=desc", headers=headers))
+    response = client.get(
+        "/admin/audit",
+        params={"page_size": 2, "sort_dir": "desc", "cursor": first["next_cursor"]},
+        headers=headers,
+    )
+    second = _extract_success_data(response)
+    assert [item["action"] for item in second["items"]] == ["sort_2", "sort_1"]
+    assert second["has_more"] is True
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
 def test_login_history_include_total_false_returns_null_total():
     engine, SessionLocal = _get_session_factory()
     app.router.on_startup.clear()
@@ -620,6 +1333,173 @@ def test_login_history_include_total_false_returns_null_total():
     engine.dispose()
 
 
+def test_login_history_csv_export_streams_rows_in_order():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-login-csv@test.local", role="admin", is_admin=True, is_approved=True)
+        db.add(admin)
+        db.commit()
+        db.add_all([
+            LoginHistory(
+                user_id=admin.id,
+                email=admin.email,
+                ip=None if idx % 2 else "10.0.0.1",
+                user_agent="agent, with comma" if idx == 0 else None,
+                result="success",
+                source="verify_code",
+                created_at=datetime(2026, 1, 1, 12, idx),
+            )
+            for idx in range(3)
+        ])
+        db.commit()
+
+    client = TestClient(app)
+    response = client.get(
+        "/admin/login-history/export.csv?sort_dir=asc",
+        headers=_auth_header("admin-login-csv@test.local", role="admin"),
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "id,created_at,email,result,source,ip,user_agent"
+    assert lines[1].endswith(',2026-01-01T12:00:00,admin-login-csv@test.local,success,verify_code,10.0.0.1,"agent, with comma"')
+    assert lines[2].endswith(",2026-01-01T12:01:00,admin-login-csv@test.local,success,verify_code,,")
+    assert len(lines) == 4
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_login_history_cursor_pages_match_offset_pages():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-login-cursor@test.local", role="admin", is_admin=True, is_approved=True)
+        db.add(admin)
+        db.commit()
+        # Pairs of rows share a timestamp, so the id tie-breaker decides the seek boundary.
+        db.add_all([
+            LoginHistory(
+                user_id=admin.id,
+                email=admin.email,
+                ip=f"10.1.0.{idx}",
+                result="success",
+                source="verify_code",
+                created_at=datetime(2026, 1, 1, 12, idx // 2),
+            )
+            for idx in range(5)
+        ])
+        db.commit()
+
+    client = TestClient(app)
+    headers = _auth_header("admin-login-cursor@test.local", role="admin")
+    base = "/admin/login-history?page_size=2&ip=10.1.0"
+    for sort_dir in ("desc", "asc"):
+        offset_ips = []
+        for page in (1, 2, 3):
+            data = _extract_success_data(client.get(f"{base}&sort_dir={sort_dir}&page={page}", headers=headers))
+            offset_ips.extend(item["ip"] for item in data["items"])
+            assert data["has_more"] is (page < 3)
+
+        cursor_ips = []
+        cursor = ""
+        while True:
+            data = _extract_success_data(
+                client.get(f"{base}&sort_dir={sort_dir}&cursor={cursor}", headers=headers)
+            )
+            cursor_ips.extend(item["ip"] for item in data["items"])
+            if cursor:
+                assert data["total"] is None
+            if not data["has_more"]:
+                assert data["next_cursor"] is None
+                break
+            cursor = data["next_cursor"]
+        assert cursor_ips == offset_ips
+        assert len(set(cursor_ips)) == 5
+
+    assert client.get(f"{base}&cursor=not-a-cursor", headers=headers).status_code == 400
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_list_cursor_binds_with_column_type_for_postgres():
+    from sqlalchemy import select
+    from sqlalchemy.dialects import postgresql
+
+    from app.db.types import UTCDateTime
+    from app.services.admin_queries import apply_list_cursor, parse_list_cursor
+
+    seek = parse_list_cursor("2026-01-01T15:00:00+03:00,7")
+    assert seek == (datetime(2026, 1, 1, 12, 0), 7)
+
+    stmt = apply_list_cursor(
+        select(LoginHistory.id),
+        created_col=LoginHistory.created_at,
+        id_col=LoginHistory.id,
+        cursor=seek,
+        sort_dir="desc",
+    )
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    created_bind = compiled.binds["param_1"]
+    assert created_bind.value == seek[0]
+    assert isinstance(created_bind.type, UTCDateTime)
+    assert "TIMESTAMP WITHOUT TIME ZONE" not in str(compiled)
+
+
+def test_login_history_combined_filters_and_invalid_date():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="admin-login-filters@test.local", role="admin", is_admin=True, is_approved=True)
+        db.add(admin)
+        db.commit()
+        db.add_all([
+            LoginHistory(
+                user_id=admin.id,
+                email=admin.email,
+                ip=f"10.0.0.{idx}",
+                user_agent=None,
+                result="success" if idx % 2 == 0 else "invalid_code",
+                source="verify_code",
+                created_at=datetime(2026, 1, 1, 12, idx),
+            )
+            for idx in range(5)
+        ])
+        db.commit()
+
+    client = TestClient(app)
+    headers = _auth_header("admin-login-filters@test.local", role="admin")
+    response = client.get(
+        "/admin/login-history?page=1&page_size=20&sort_dir=asc&result=success&ip=10.0.0"
+        "&date_from=2026-01-01T12:01:00&date_to=2026-01-01T12:04:00",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = _extract_success_data(response)
+    assert [item["ip"] for item in data["items"]] == ["10.0.0.2", "10.0.0.4"]
+    assert data["total"] == 2
+
+    response = client.get("/admin/login-history?date_to=yesterday", headers=headers)
+    assert response.status_code == 400
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
 def test_users_and_root_admins_pages_have_parity_for_trusted_devices_count():
     prev_admin_emails = os.environ.get("ADMIN_EMAILS")
     os.environ["ADMIN_EMAILS"] = "root-parity@test.local"
@@ -786,6 +1666,45 @@ def test_error_envelope_for_missing_event():
     engine.dispose()
 
 
+def test_events_feed_creates_one_state_row_per_event():
+    engine, SessionLocal = _get_session_factory()
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    app.dependency_overrides[get_db] = _override_get_db(SessionLocal)
+
+    with SessionLocal() as db:
+        admin = _make_user(email="feed-admin@test.local", role="admin", is_admin=True)
+        db.add(admin)
+        db.flush()
+        db.add_all([
+            EventFeed(event_type="auth.login", channel="notification", title="first"),
+            EventFeed(event_type="auth.login", channel="notification", title="second"),
+            EventFeed(event_type="admin.approve", channel="action", title="own", actor_user_id=admin.id),
+        ])
+        db.commit()
+        admin_id = admin.id
+
+    client = TestClient(app)
+    for _ in range(2):
+        response = client.get("/events/feed", headers=_auth_header("feed-admin@test.local", role="admin"))
+        assert response.status_code == 200
+        data = _extract_success_data(response)
+        assert data["total"] == 3
+
+    with SessionLocal() as db:
+        states = db.query(EventUserState).filter(EventUserState.user_id == admin_id).all()
+        assert len(states) == 3
+        read_by_title = {
+            db.get(EventFeed, st.event_id).title: st.is_read
+            for st in states
+        }
+        assert read_by_title == {"first": False, "second": False, "own": True}
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
 def test_success_envelope_for_auth_me():
     engine, SessionLocal = _get_session_factory()
     app.router.on_startup.clear()
@@ -972,6 +1891,11 @@ def test_update_admin_emails_noop_allows_empty_reason():
         data = _extract_success_data(response)
         assert data["ok"] is True
         assert data.get("reason_mode") == "optional"
+        assert data["sync"] == {"created": 0, "promoted": 0, "demoted": 0, "skipped_create_without_password": 0}
+        with open(env_path, encoding="utf-8") as f:
+            assert f.read() == "ADMIN_EMAILS=root@test.local\n"
+        with SessionLocal() as db:
+            assert db.query(AdminAuditLog).filter(AdminAuditLog.action == "update_admin_emails").count() == 0
 
         app.dependency_overrides.clear()
         Base.metadata.drop_all(bind=engine)
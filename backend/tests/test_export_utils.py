@@ -0,0 +1,29 @@
+import asyncio
+import io
+
+from openpyxl import load_workbook
+
+from app.core import export_utils
+
+
+def _read_body(response) -> bytes:
+    async def collect() -> bytes:
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(collect())
+
+
+def test_xlsx_export_splits_rows_into_sheet_segments(monkeypatch):
+    monkeypatch.setattr(export_utils, "XLSX_SEGMENT_ROWS", 2)
+    response = export_utils.xlsx_attachment_response(
+        filename="rows.xlsx",
+        sheet_name="Audit",
+        header=["id", "value"],
+        rows=([idx, f"row {idx}"] for idx in range(5)),
+    )
+
+    wb = load_workbook(io.BytesIO(_read_body(response)), read_only=True)
+    assert wb.sheetnames == ["Audit", "Audit (2)", "Audit (3)"]
+    segments = [list(wb[name].iter_rows(values_only=True)) for name in wb.sheetnames]
+    assert all(rows[0] == ("id", "value") for rows in segments)
+    assert [row[0] for rows in segments for row in rows[1:]] == [0, 1, 2, 3, 4]